@@ -2,23 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterable
+from functools import partial
 import logging
+import time
 from typing import Any
 
 from aiohttp.client import ClientSession, ClientTimeout
-from aiohttp.client_exceptions import (
-    ClientConnectorError,
-    ClientError,
-    ClientResponseError,
-)
+from aiohttp.client_exceptions import ClientError
 
 from . import const as CONST
+from .consumption import VoltalisConsumptionSample, format_timestamp, parse_samples
 from .exceptions import VoltalisAuthenticationException, VoltalisException
 from .appliance import VoltalisAppliance
+from .auth import VoltalisTokenManager
+from .breaker import VoltalisCircuitBreaker
+from .cache import VoltalisResponseCache, conditional_headers
+from .decode import async_iter_json_array, json_loads
+from .limiter import VoltalisRateLimiter
+from .logs import VoltalisPayloadLog
 from .program import ProgramType, VoltalisProgram
+from .refresh import VoltalisChanges, VoltalisRefreshEngine, VoltalisRefreshReport
+from .retry import VoltalisRetryPolicy
+from .site import VoltalisSite
+from .stats import VoltalisRequestStats
+from .writer import VoltalisWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
 
 class Voltalis:
@@ -30,13 +41,67 @@ class Voltalis:
         password: str | None = None,
         auto_login: bool = False,
         session: ClientSession | None = None,
+        max_concurrent_requests: int = CONST.DEFAULT_MAX_CONCURRENT_REQUESTS,
+        bulk_refresh: bool = True,
+        retry_policy: VoltalisRetryPolicy | None = None,
+        response_cache: VoltalisResponseCache | None = None,
+        base_url: str = CONST.BASE_URL,
+        keep_json: bool = False,
+        request_semaphore: asyncio.Semaphore | None = None,
+        request_stagger: float = 0.0,
+        rate_limiter: VoltalisRateLimiter | None = None,
+        request_stats: VoltalisRequestStats | None = None,
+        payload_log: VoltalisPayloadLog | None = None,
+        json_loads: Callable[[bytes], Any] = json_loads,
+        stream_appliances: bool = False,
+        circuit_breaker: VoltalisCircuitBreaker | None = None,
     ) -> None:
-        """Constructor."""
+        """Constructor.
+
+        request_semaphore bounds the requests in flight, it can be shared
+        by several clients. request_stagger spreads the start of the
+        requests of a refresh cycle over that many seconds. json_loads
+        decodes the JSON bodies, orjson when installed. stream_appliances
+        decodes the appliance list of the refresh cycles item by item.
+        circuit_breaker decides which appliances are polled one by one.
+        """
+        self._base_url = base_url
+        self.keep_json = keep_json
         self._username = username
         self._password = password
         self._auto_login = auto_login
         self._appliances: dict[int, VoltalisAppliance] = {}
         self._programs: dict[int, VoltalisProgram] = {}
+        self._sites: dict[int, VoltalisSite] = {}
+        self._refresh_engine = VoltalisRefreshEngine(
+            max_concurrent_requests, stagger=request_stagger
+        )
+        self._request_semaphore = (
+            request_semaphore
+            if request_semaphore is not None
+            else asyncio.Semaphore(max_concurrent_requests)
+        )
+        self._bulk_refresh = bulk_refresh
+        self._token_manager = VoltalisTokenManager(self._async_request_token)
+        self._retry_policy = retry_policy if retry_policy else VoltalisRetryPolicy()
+        self._rate_limiter = rate_limiter if rate_limiter else VoltalisRateLimiter()
+        self._json_loads = json_loads
+        self._stream_appliances = stream_appliances
+        self._circuit_breaker = (
+            circuit_breaker if circuit_breaker else VoltalisCircuitBreaker()
+        )
+        self._payload_log = payload_log if payload_log else VoltalisPayloadLog()
+        self._request_stats = (
+            request_stats if request_stats is not None else VoltalisRequestStats()
+        )
+        self._response_cache = (
+            response_cache if response_cache is not None else VoltalisResponseCache()
+        )
+        self._changes = VoltalisChanges()
+        self._initialize_task: asyncio.Task[VoltalisRefreshReport] | None = None
+        self._write_queue = VoltalisWriteQueue(
+            self._async_send_manualsetting, max_concurrency=max_concurrent_requests
+        )
 
         if session is None:
             session = ClientSession()
@@ -45,7 +110,6 @@ class Voltalis:
 
         # Create a new cache template
         self._cache: dict[str, str] = {
-            CONST.AUTH_TOKEN: "",
             CONST.DEFAULT_SITE_ID: "",
         }
 
@@ -59,18 +123,155 @@ class Voltalis:
         if self._session and self._close_session:
             await self._session.close()
 
-    async def async_initialize(self) -> None:
-        """Initialize."""
+    async def async_initialize(self) -> VoltalisRefreshReport:
+        """Initialize.
+
+        Login and the sites are needed first, then appliances, manual
+        settings, programs, quick settings and diagnostics of every site
+        are fetched concurrently. The initialization runs once, later and concurrent
+        calls share its report until the next logout.
+        """
+        if self._initialize_task is None or (
+            self._initialize_task.done() and self._initialize_task.exception()
+        ):
+            self._initialize_task = asyncio.get_running_loop().create_task(
+                self._async_initialize()
+            )
+        return await asyncio.shield(self._initialize_task)
+
+    async def _async_initialize(self) -> VoltalisRefreshReport:
+        """Run the initialization steps and time each of them."""
+        start = time.monotonic()
+        latencies: dict[str, float] = {}
         if (
             self._username is not None
             and self._password is not None
             and self._auto_login
         ):
             await self.async_login()
+            latencies["login"] = time.monotonic() - start
+
+        sites_start = time.monotonic()
+        sites = await self.async_get_sites()
+        latencies["sites"] = time.monotonic() - sites_start
+
+        requests = {}
+        for site in sites:
+            for label, url in (
+                ("appliances", site.appliance_url),
+                ("manualsettings", site.manualsetting_url),
+                ("programs", site.programs_url),
+                ("quicksettings", site.quicksettings_url),
+                ("autodiag", site.autodiag_url),
+            ):
+                requests[f"{label} {site.id}"] = partial(
+                    self.async_send_request, url, method=CONST.HTTPMethod.GET
+                )
+        self._retry_policy.start_cycle()
+        report = await self._refresh_engine.async_run(requests)
+
+        for site in sites:
+            # Appliances first, the other payloads refer to them
+            results = report.results
+            self._reconcile_appliances(site, results[f"appliances {site.id}"])
+            self._apply_manualsettings(results[f"manualsettings {site.id}"])
+            for program_json in results[f"programs {site.id}"]:
+                self._reconcile_program(site, program_json, ProgramType.USER)
+            for program_json in results[f"quicksettings {site.id}"]:
+                self._reconcile_program(site, program_json, ProgramType.DEFAULT)
+            self._apply_diagnostics(site, results[f"autodiag {site.id}"])
+
+        report.latencies = {**latencies, **report.latencies}
+        report.duration = time.monotonic() - start
+        report.changes = self.pop_changes()
+        report.retries = (
+            self._retry_policy.max_retries_per_cycle - self._retry_policy.retries_left
+        )
+        _LOGGER.debug(
+            "Initialization took %.3fs, slowest step %s",
+            report.duration,
+            max(report.latencies, key=report.latencies.get),
+        )
+        return report
+
+    @property
+    def appliances(self) -> list[VoltalisAppliance]:
+        """Get the known appliances."""
+        return list(self._appliances.values())
+
+    @property
+    def programs(self) -> list[VoltalisProgram]:
+        """Get the known programs."""
+        return list(self._programs.values())
+
+    @property
+    def sites(self) -> list[VoltalisSite]:
+        """Get the known sites, the default one first."""
+        return list(self._sites.values())
+
+    def export_snapshot(self) -> dict[str, Any]:
+        """Export the last known sites, appliances, programs and manual settings."""
+        return {
+            "sites": [site.to_json() for site in self._sites.values()],
+            "appliances": [
+                {
+                    **appliance.get_json(),
+                    "idManualSetting": appliance.idManualSetting,
+                    "isReachable": appliance.isReachable,
+                    "siteId": appliance.site.id,
+                }
+                for appliance in self._appliances.values()
+            ],
+            "programs": [
+                {
+                    **program.get_json(),
+                    "programType": program.programType.value,
+                    "siteId": program.site.id,
+                }
+                for program in self._programs.values()
+            ],
+        }
+
+    def load_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Build the sites, appliances and programs from an exported snapshot."""
+        for site_json in snapshot["sites"]:
+            self._add_site(site_json["id"], site_json["name"], site_json["isDefault"])
+
+        for appliance_json in snapshot["appliances"]:
+            site = self._sites[appliance_json["siteId"]]
+            appliance = VoltalisAppliance(appliance_json, self, site)
+            appliance.idManualSetting = appliance_json["idManualSetting"]
+            appliance.isReachable = appliance_json["isReachable"]
+            self._appliances[appliance.id] = site.appliances[appliance.id] = appliance
+        for program_json in snapshot["programs"]:
+            site = self._sites[program_json["siteId"]]
+            program = VoltalisProgram(
+                program_json, self, ProgramType(program_json["programType"]), site
+            )
+            self._programs[program.id] = site.programs[program.id] = program
+
+    def _add_site(
+        self, site_id: int, name: str | None, is_default: bool
+    ) -> VoltalisSite:
+        """Add a site, or update the name of a known one."""
+        if (site := self._sites.get(site_id)) is None:
+            site = VoltalisSite(site_id, name, is_default, self._base_url)
+            self._sites[site_id] = site
+        site.name = name
+        site.isDefault = is_default
+        if is_default:
+            self.update_cache(CONST.DEFAULT_SITE_ID, site_id)
+        return site
 
-        await self.async_get_default_site_id()
-        await self.async_get_appliances()
-        await self.async_get_programs()
+    def _get_sites(self, site: VoltalisSite | None) -> list[VoltalisSite]:
+        """Get the given site, or every site when None."""
+        return [site] if site is not None else list(self._sites.values())
+
+    def _get_site(self, appliance_or_program: Any) -> VoltalisSite:
+        """Get the site of an appliance or program, the default one if unknown."""
+        if appliance_or_program is not None:
+            return appliance_or_program.site
+        return self._sites[self.cache(CONST.DEFAULT_SITE_ID)]
 
     def cache(self, key: str) -> str:
         """Get a cached value."""
@@ -80,129 +281,555 @@ class Voltalis:
         """Update a cached value."""
         self._cache.update({key: value})
 
+    @property
+    def token_manager(self) -> VoltalisTokenManager:
+        """Get the authentication token manager."""
+        return self._token_manager
+
+    @property
+    def retry_policy(self) -> VoltalisRetryPolicy:
+        """Get the retry policy."""
+        return self._retry_policy
+
+    @property
+    def payload_log(self) -> VoltalisPayloadLog:
+        """Get the payload log."""
+        return self._payload_log
+
+    @property
+    def request_stats(self) -> VoltalisRequestStats:
+        """Get the request statistics."""
+        return self._request_stats
+
+    @property
+    def circuit_breaker(self) -> VoltalisCircuitBreaker:
+        """Get the circuit breaker of the appliances."""
+        return self._circuit_breaker
+
+    @property
+    def rate_limiter(self) -> VoltalisRateLimiter:
+        """Get the request rate limiter."""
+        return self._rate_limiter
+
+    @property
+    def response_cache(self) -> VoltalisResponseCache:
+        """Get the GET response cache."""
+        return self._response_cache
+
+    @property
+    def write_queue(self) -> VoltalisWriteQueue:
+        """Get the manual setting write queue."""
+        return self._write_queue
+
+    def pop_changes(self) -> VoltalisChanges:
+        """Get the appliances and programs changed since the last call."""
+        changes, self._changes = self._changes, VoltalisChanges()
+        return changes
+
     async def async_login(self) -> bool:
         """Execute Voltalis login."""
+        await self._token_manager.async_refresh()
+        _LOGGER.info("Login successful")
+
+    async def _async_request_token(self) -> str:
+        """Send the login request and return the new token."""
         _LOGGER.debug("Login start")
         login_data: dict[str, str | int] = {
             "login": self._username,
             "password": self._password,
         }
         response = await self.async_send_request(
-            CONST.LOGIN_URL, json=login_data, retry=False, method=CONST.HTTPMethod.POST
+            CONST.LOGIN_URL, json=login_data, method=CONST.HTTPMethod.POST
         )
-        _LOGGER.debug("Login Response: %s", response)
-        self.update_cache(CONST.AUTH_TOKEN, response["token"])
-        _LOGGER.info("Login successful")
+        return response["token"]
 
     async def async_logout(self) -> bool:
         """Execute Voltalis logout."""
         await self.async_send_request(
             CONST.LOGOUT_URL, retry=False, method=CONST.HTTPMethod.DELETE
         )
+        self._token_manager.clear()
+        self._initialize_task = None
         _LOGGER.info("Logout successful")
 
     async def async_get_default_site_id(self) -> int:
         """Get Voltalis account default site id."""
-        _LOGGER.debug("Get default site id start")
-        response = await self.async_send_request(
-            CONST.ACCOUNT_ME_URL, retry=False, method=CONST.HTTPMethod.GET
-        )
-        self.update_cache(CONST.DEFAULT_SITE_ID, response["defaultSite"]["id"])
-        _LOGGER.info("Default site id = %s", self.cache(CONST.DEFAULT_SITE_ID))
+        await self.async_get_sites()
         return self.cache(CONST.DEFAULT_SITE_ID)
 
-    async def async_get_appliances(self) -> list[VoltalisAppliance]:
-        """Get all Voltalis appliances."""
-        _LOGGER.debug("Get all Voltalis appliances")
-        appliances_json = await self.async_send_request(
-            CONST.APPLIANCE_URL, retry=False, method=CONST.HTTPMethod.GET
+    async def async_get_sites(self) -> list[VoltalisSite]:
+        """Get every site of the Voltalis account, the default one first."""
+        _LOGGER.debug("Get sites start")
+        response = await self.async_send_request(
+            CONST.ACCOUNT_ME_URL, method=CONST.HTTPMethod.GET
         )
-        for appliance_json in appliances_json:
-            appliance = VoltalisAppliance(appliance_json, self)
-            self._appliances[appliance.id] = appliance
+        sites = [
+            self._add_site(
+                site_json["id"], site_json.get("name"), site_json is response["defaultSite"]
+            )
+            for site_json in (response["defaultSite"], *response.get("otherSites", []))
+        ]
+        _LOGGER.info(
+            "Default site id = %s, %d sites",
+            self.cache(CONST.DEFAULT_SITE_ID),
+            len(sites),
+        )
+        return sites
+
+    async def async_get_appliances(
+        self, site: VoltalisSite | None = None
+    ) -> list[VoltalisAppliance]:
+        """Get all Voltalis appliances of a site, or of every site."""
+        for target in self._get_sites(site):
+            _LOGGER.debug("Get all Voltalis appliances of site %s", target.id)
+            appliances_json = await self.async_send_request(
+                target.appliance_url, method=CONST.HTTPMethod.GET
+            )
+            self._reconcile_appliances(target, appliances_json)
 
-        await self.async_update_manualsettings()
+            await self.async_update_manualsettings(target)
 
         return list(self._appliances.values())
 
-    async def async_get_programs(self) -> list[VoltalisProgram]:
-        """Get all Voltalis heater programs."""
-        _LOGGER.debug("Get all Voltalis user defined heater programs")
-        programs_json = await self.async_send_request(
-            CONST.PROGRAMMING_PROGRAMS_URL, retry=False, method=CONST.HTTPMethod.GET
-        )
-        for program_json in programs_json:
-            program = VoltalisProgram(program_json, self, ProgramType.USER)
-            self._programs[program.id] = program
+    def _reconcile_appliances(
+        self, site: VoltalisSite, appliances_json: list[dict[str, Any]]
+    ) -> None:
+        """Update the known appliances in place and add the new ones."""
+        for appliance_json in appliances_json:
+            if appliance_json["id"] in self._appliances:
+                appliance = self._appliances[appliance_json["id"]]
+                if appliance.update_json(appliance_json):
+                    self._changes.appliances.add(appliance.id)
+            else:
+                appliance = VoltalisAppliance(appliance_json, self, site)
+                self._appliances[appliance.id] = site.appliances[appliance.id] = appliance
+            self._record_success(appliance, self._changes.appliances)
 
-        _LOGGER.debug("Get all Voltalis default heater programs")
-        programs_json = await self.async_send_request(
-            CONST.QUICK_SETTINGS_URL, retry=False, method=CONST.HTTPMethod.GET
-        )
-        for program_json in programs_json:
-            program = VoltalisProgram(program_json, self, ProgramType.DEFAULT)
-            self._programs[program.id] = program
+    async def async_update_appliances(self, site: VoltalisSite | None = None) -> None:
+        """Update the known appliances of a site from the collection endpoint."""
+        for target in self._get_sites(site):
+            _LOGGER.debug("Update all Voltalis appliances of site %s", target.id)
+            update = partial(self._update_site_appliance, target)
+            try:
+                if self._stream_appliances:
+                    if await self.async_send_request(
+                        target.appliance_url, method=CONST.HTTPMethod.GET, on_item=update
+                    ):
+                        # Not modified, no item was streamed
+                        for appliance in target.appliances.values():
+                            self._record_success(appliance, self._changes.appliances)
+                    continue
+                appliances_json = await self.async_send_request(
+                    target.appliance_url, method=CONST.HTTPMethod.GET
+                )
+                if appliances_json is None:
+                    raise VoltalisException(
+                        f"Voltalis appliances of site {target.id} not found"
+                    )
+            except VoltalisException as err:
+                self._record_failure(
+                    target.appliances.values(), err, self._changes.appliances
+                )
+                raise
+            for appliance_json in appliances_json:
+                update(appliance_json)
+
+    def _update_site_appliance(
+        self, site: VoltalisSite, appliance_json: dict[str, Any]
+    ) -> None:
+        """Update a known appliance of a site in place."""
+        appliance = site.appliances.get(appliance_json["id"])
+        if appliance is None:
+            _LOGGER.debug("Ignore unknown Voltalis appliance %s", appliance_json["id"])
+            return
+        if appliance.update_json(appliance_json):
+            self._changes.appliances.add(appliance.id)
+        self._record_success(appliance, self._changes.appliances)
+
+    def _record_success(
+        self, item: VoltalisAppliance | VoltalisProgram, changed: set[int]
+    ) -> None:
+        """Record the refresh of an appliance or a program."""
+        if item.health.record_success():
+            changed.add(item.id)
+        if (
+            isinstance(item, VoltalisAppliance)
+            and self._circuit_breaker.record_success(item.id) is False
+        ):
+            _LOGGER.info("Voltalis appliance %s answers again", item.id)
+
+    def _record_failure(
+        self,
+        items: Iterable[VoltalisAppliance | VoltalisProgram],
+        error: BaseException,
+        changed: set[int],
+    ) -> None:
+        """Record a failed refresh, the items keep their last good state."""
+        for item in items:
+            item.health.record_failure(error)
+            changed.add(item.id)
+
+    async def async_get_programs(
+        self, site: VoltalisSite | None = None
+    ) -> list[VoltalisProgram]:
+        """Get all Voltalis heater programs of a site, or of every site."""
+        for target in self._get_sites(site):
+            _LOGGER.debug("Get all Voltalis user defined heater programs")
+            programs_json = await self.async_send_request(
+                target.programs_url, method=CONST.HTTPMethod.GET
+            )
+            for program_json in programs_json:
+                self._reconcile_program(target, program_json, ProgramType.USER)
+
+            _LOGGER.debug("Get all Voltalis default heater programs")
+            programs_json = await self.async_send_request(
+                target.quicksettings_url, method=CONST.HTTPMethod.GET
+            )
+            for program_json in programs_json:
+                self._reconcile_program(target, program_json, ProgramType.DEFAULT)
 
         return list(self._programs.values())
 
-    async def async_update_manualsettings(self) -> None:
+    def _reconcile_program(
+        self,
+        site: VoltalisSite,
+        program_json: dict[str, Any],
+        program_type: ProgramType,
+    ) -> None:
+        """Update a known program in place or add a new one."""
+        if program_json["id"] in self._programs:
+            program = self._programs[program_json["id"]]
+            if program.update_json(program_json):
+                self._changes.programs.add(program.id)
+        else:
+            program = VoltalisProgram(program_json, self, program_type, site)
+            self._programs[program.id] = site.programs[program.id] = program
+        self._record_success(program, self._changes.programs)
+
+    async def async_update_manualsettings(
+        self, site: VoltalisSite | None = None
+    ) -> None:
         """Get all Voltalis appliances manual settings."""
-        _LOGGER.debug("Get all Voltalis appliances manual settings")
-        manualsettings_json = await self.async_send_request(
-            CONST.MANUAL_SETTING_URL, retry=False, method=CONST.HTTPMethod.GET
-        )
+        for target in self._get_sites(site):
+            _LOGGER.debug("Get all Voltalis appliances manual settings")
+            manualsettings_json = await self.async_send_request(
+                target.manualsetting_url, method=CONST.HTTPMethod.GET
+            )
+            self._apply_manualsettings(manualsettings_json)
+
+    def _apply_manualsettings(self, manualsettings_json: list[dict[str, Any]]) -> None:
+        """Set the manual setting id of each appliance."""
         for manualsetting_json in manualsettings_json:
+            appliance = self._appliances[manualsetting_json["idAppliance"]]
+            if appliance.idManualSetting != manualsetting_json["id"]:
+                _LOGGER.debug(
+                    "Update appliance %s manual setting id to %s",
+                    appliance.id,
+                    manualsetting_json["id"],
+                )
+                appliance.idManualSetting = manualsetting_json["id"]
+
+    async def async_update_appliances_diagnostics(
+        self, site: VoltalisSite | None = None
+    ) -> None:
+        """Get Voltalis appliances diagnostics."""
+        for target in self._get_sites(site):
+            _LOGGER.debug("Check diagnostic for all appliances of site %s", target.id)
+            diagnostics_json = await self.async_send_request(
+                target.autodiag_url,
+                method=CONST.HTTPMethod.GET,
+            )
+            if diagnostics_json is None:
+                raise VoltalisException(
+                    f"Voltalis diagnostics of site {target.id} not found"
+                )
+            self._apply_diagnostics(target, diagnostics_json)
+
+    def _apply_diagnostics(
+        self, site: VoltalisSite, diagnostics_json: list[dict[str, Any]]
+    ) -> None:
+        """Update the reachability of the appliances of a site."""
+        if diagnostics_json is site.diagnostics_json:
+            return
+        site.diagnostics_json = diagnostics_json
+        for diagnostic in diagnostics_json:
+            appliance = self._appliances.get(diagnostic["csApplianceId"])
+            if appliance is None:
+                _LOGGER.debug(
+                    "Ignore diagnostic of unknown Voltalis appliance %s",
+                    diagnostic["csApplianceId"],
+                )
+                continue
+            is_reachable = diagnostic["status"] == "OK"
+            if appliance.isReachable != is_reachable:
+                appliance.isReachable = is_reachable
+                self._changes.appliances.add(appliance.id)
+            # Warn once when the circuit opens, not at every cycle
+            circuit = self._circuit_breaker.record_reachable(appliance.id, is_reachable)
+            if circuit:
+                _LOGGER.warning(
+                    "Voltalis appliance '%s' with id %s not reachable.\n %s",
+                    appliance.name,
+                    appliance.id,
+                    diagnostic,
+                )
+            elif circuit is False:
+                _LOGGER.info(
+                    "Voltalis appliance '%s' with id %s reachable again",
+                    appliance.name,
+                    appliance.id,
+                )
+
+    async def async_update_consumption(self, site: VoltalisSite | None = None) -> None:
+        """Get the Voltalis consumption samples since the last ones fetched.
+
+        Only the points from the cursor of the site onwards are requested,
+        the newest known step again as it may still be growing.
+        """
+        for target in self._get_sites(site):
+            points = target.consumption.points_since_cursor(time.time())
             _LOGGER.debug(
-                f"Update appliance {manualsetting_json['idAppliance']} manual setting id to {manualsetting_json['id']}"
+                "Update consumption of site %s, %d points", target.id, points
             )
-            self._appliances[
-                manualsetting_json["idAppliance"]
-            ].idManualSetting = manualsetting_json["id"]
+            consumption_json = await self.async_send_request(
+                f"{target.consumption_url}?mode={CONST.CONSUMPTION_MODE}"
+                f"&numPoints={points}",
+                method=CONST.HTTPMethod.GET,
+            )
+            if consumption_json and target.consumption.update_json(consumption_json):
+                self._changes.consumption.add(target.id)
 
-    async def async_update_appliances_diagnostics(self) -> None:
-        """Get Voltalis appliances diagnostics."""
-        _LOGGER.debug("Check diagnostic for all appliances")
-        diagnostics_json = await self.async_send_request(
-            CONST.AUTODIAG_URL,
-            retry=False,
+    async def async_get_consumption_history(
+        self, site: VoltalisSite, start: float, end: float
+    ) -> list[VoltalisConsumptionSample]:
+        """Get the hourly Voltalis consumption of a site between two timestamps.
+
+        Nothing is kept by the client, long ranges are to be paged by the
+        caller.
+        """
+        _LOGGER.debug(
+            "Get consumption history of site %s from %s to %s", site.id, start, end
+        )
+        consumption_json = await self.async_send_request(
+            f"{site.consumption_history_url}?mode={CONST.CONSUMPTION_HISTORY_MODE}"
+            f"&from={format_timestamp(start)}&to={format_timestamp(end)}",
             method=CONST.HTTPMethod.GET,
+            cache=False,
         )
-        for diagnostic in diagnostics_json:
-            self._appliances[diagnostic["csApplianceId"]].isReachable = diagnostic["status"] == "OK"
-            if diagnostic["status"] == "NOK":
-                _LOGGER.warning(f"Voltalis appliance '{self._appliances[diagnostic["csApplianceId"]].name}' with id {diagnostic["csApplianceId"]} not reachable.\n {diagnostic}")
+        if consumption_json is None:
+            raise VoltalisException(
+                f"Voltalis consumption history of site {site.id} not found"
+            )
+        if not consumption_json:
+            return []
+        return parse_samples(consumption_json)
 
-    async def async_update_appliance(self, appliance_id: int) -> None:
-        """Get a Voltalis appliance."""
-        _LOGGER.debug(f"Update Voltalis appliance {appliance_id}")
-        appliance_json = await self.async_send_request(
-            f"{CONST.APPLIANCE_URL}/{appliance_id}",
-            retry=False,
-            method=CONST.HTTPMethod.GET,
+    async def async_refresh(
+        self,
+        appliances: bool = True,
+        diagnostics: bool = True,
+        user_programs: bool = True,
+        default_programs: bool = True,
+        consumption: bool = False,
+        timeout: float | None = None,
+    ) -> VoltalisRefreshReport:
+        """Refresh appliances, diagnostics, programs and consumption concurrently.
+
+        Each flag selects a data class to refresh in this cycle, for every
+        site of the account. A failed request only records the failure on
+        its appliances or programs, which keep their last good state, the
+        cycle only fails when every request did.
+
+        The timeout is extended by the time the requests of the cycle wait
+        for the rate limiter, so a large account is not cut short by its
+        own request budget.
+        """
+        requests = {}
+        urls = []
+        for site in self._sites.values():
+            if appliances and self._bulk_refresh:
+                requests[f"appliances {site.id}"] = partial(
+                    self.async_update_appliances, site
+                )
+                urls.append(site.appliance_url)
+            if diagnostics:
+                requests[f"autodiag {site.id}"] = partial(
+                    self.async_update_appliances_diagnostics, site
+                )
+                urls.append(site.autodiag_url)
+            if default_programs:
+                requests[f"quicksettings {site.id}"] = partial(
+                    self.async_update_default_programs, site
+                )
+                urls.append(site.quicksettings_url)
+            if consumption:
+                requests[f"consumption {site.id}"] = partial(
+                    self.async_update_consumption, site
+                )
+                urls.append(site.consumption_url)
+        if appliances and not self._bulk_refresh:
+            for appliance_id in self._appliances:
+                if not self._circuit_breaker.allow(appliance_id):
+                    continue
+                requests[f"appliance {appliance_id}"] = partial(
+                    self.async_update_appliance, appliance_id
+                )
+                site = self._appliances[appliance_id].site
+                urls.append(f"{site.appliance_url}/{appliance_id}")
+        if user_programs:
+            for program in self._programs.values():
+                if program.programType == ProgramType.USER:
+                    requests[f"program {program.id}"] = program.async_update
+                    urls.append(f"{program.site.programs_url}/{program.id}")
+
+        self._retry_policy.start_cycle()
+        report = await asyncio.wait_for(
+            self._refresh_engine.async_run(requests, isolate=True),
+            self._budget_timeout(timeout, urls),
+        )
+        report.changes = self.pop_changes()
+        report.retries = (
+            self._retry_policy.max_retries_per_cycle - self._retry_policy.retries_left
+        )
+        _LOGGER.debug(
+            "Refresh cycle took %.3fs for %d requests (%d failed), "
+            "%d appliances and %d programs changed",
+            report.duration,
+            report.request_count,
+            len(report.errors),
+            len(report.changes.appliances),
+            len(report.changes.programs),
+        )
+        return report
+
+    def _budget_timeout(self, timeout: float | None, urls: list[str]) -> float | None:
+        """Extend a timeout by the rate limiter wait of GET requests to urls."""
+        if timeout is None:
+            return None
+        return timeout + self._rate_limiter.estimate_delay(
+            sum(
+                self._rate_limiter.get_weight(CONST.HTTPMethod.GET, url)
+                for url in urls
+            )
         )
-        self._appliances[appliance_id]._appliance_json = appliance_json
-        self._appliances[appliance_id]._programming._programming_json = appliance_json[
-            "programming"
+
+    async def async_refresh_appliances(
+        self, appliance_ids: Iterable[int], timeout: float | None = None
+    ) -> VoltalisRefreshReport:
+        """Refresh only the given appliances, concurrently.
+
+        Many appliances are refreshed from the collection endpoint of their
+        sites instead, to save the request budget. Failures are isolated and
+        the timeout extended as in async_refresh.
+        """
+        appliance_ids = [
+            appliance_id
+            for appliance_id in appliance_ids
+            if appliance_id in self._appliances
         ]
+        if self._bulk_refresh and len(appliance_ids) > CONST.BULK_REFRESH_THRESHOLD:
+            sites = {self._appliances[appliance_id].site for appliance_id in appliance_ids}
+            requests = {
+                f"appliances {site.id}": partial(self.async_update_appliances, site)
+                for site in sites
+            }
+            urls = [site.appliance_url for site in sites]
+        else:
+            requests = {
+                f"appliance {appliance_id}": partial(
+                    self.async_update_appliance, appliance_id
+                )
+                for appliance_id in appliance_ids
+                if self._circuit_breaker.allow(appliance_id)
+            }
+            urls = [
+                f"{self._appliances[appliance_id].site.appliance_url}/{appliance_id}"
+                for appliance_id in appliance_ids
+            ]
+        report = await asyncio.wait_for(
+            self._refresh_engine.async_run(requests, isolate=True),
+            self._budget_timeout(timeout, urls),
+        )
+        report.changes = self.pop_changes()
+        return report
+
+    async def async_update_appliance(self, appliance_id: int) -> None:
+        """Get a Voltalis appliance."""
+        _LOGGER.debug("Update Voltalis appliance %s", appliance_id)
+        appliance = self._appliances[appliance_id]
+        try:
+            appliance_json = await self.async_send_request(
+                f"{appliance.site.appliance_url}/{appliance_id}",
+                method=CONST.HTTPMethod.GET,
+            )
+            if appliance_json is None:
+                raise VoltalisException(f"Voltalis appliance {appliance_id} not found")
+        except VoltalisException as err:
+            self._record_failure([appliance], err, self._changes.appliances)
+            if self._circuit_breaker.record_failure(appliance_id):
+                _LOGGER.warning(
+                    "Voltalis appliance %s failed %d times in a row, poll it less often",
+                    appliance_id,
+                    appliance.health.error_count,
+                )
+            raise
+        if appliance.update_json(appliance_json):
+            self._changes.appliances.add(appliance_id)
+        self._record_success(appliance, self._changes.appliances)
 
-    async def async_update_default_programs(self) -> None:
+    async def async_update_default_programs(
+        self, site: VoltalisSite | None = None
+    ) -> None:
         """Get Voltalis default programs and update the data model."""
-        _LOGGER.debug("Update Voltalis default heater programs")
-        programs_json = await self.async_send_request(
-            CONST.QUICK_SETTINGS_URL, retry=False, method=CONST.HTTPMethod.GET
-        )
-        for program_json in programs_json:
-            self._programs[program_json["id"]]._program_json = program_json
+        for target in self._get_sites(site):
+            _LOGGER.debug("Update Voltalis default heater programs of site %s", target.id)
+            try:
+                programs_json = await self.async_send_request(
+                    target.quicksettings_url, method=CONST.HTTPMethod.GET
+                )
+                if programs_json is None:
+                    raise VoltalisException(
+                        f"Voltalis default programs of site {target.id} not found"
+                    )
+            except VoltalisException as err:
+                self._record_failure(
+                    (
+                        program
+                        for program in target.programs.values()
+                        if program.programType == ProgramType.DEFAULT
+                    ),
+                    err,
+                    self._changes.programs,
+                )
+                raise
+            for program_json in programs_json:
+                program = target.programs.get(program_json["id"])
+                if program is None:
+                    _LOGGER.debug(
+                        "Ignore unknown Voltalis default program %s", program_json["id"]
+                    )
+                    continue
+                if program.update_json(program_json):
+                    self._changes.programs.add(program.id)
+                self._record_success(program, self._changes.programs)
 
     async def async_update_user_program(self, program_id: int) -> None:
         """Get Voltalis user programs and update the data model."""
-        _LOGGER.debug(f"Update Voltalis user defined heater programs {program_id}")
-        program_json = await self.async_send_request(
-            f"{CONST.PROGRAMMING_PROGRAMS_URL}/{program_id}",
-            retry=False,
-            method=CONST.HTTPMethod.GET,
-        )
-        self._programs[program_id]._program_json = program_json
+        _LOGGER.debug("Update Voltalis user defined heater programs %s", program_id)
+        program = self._programs[program_id]
+        try:
+            program_json = await self.async_send_request(
+                f"{program.site.programs_url}/{program_id}",
+                method=CONST.HTTPMethod.GET,
+            )
+            if program_json is None:
+                raise VoltalisException(f"Voltalis program {program_id} not found")
+        except VoltalisException as err:
+            self._record_failure([program], err, self._changes.programs)
+            raise
+        if program.update_json(program_json):
+            self._changes.programs.add(program_id)
+        self._record_success(program, self._changes.programs)
 
     async def async_set_manualsetting(
         self,
@@ -210,98 +837,220 @@ class Voltalis:
         **kwargs: Any,
     ) -> None:
         """Set Voltalis appliance manual settings."""
-        _LOGGER.debug(f"Set Voltalis appliance programming {programming_id} ")
-        _LOGGER.debug(f"json = {kwargs.get('json','empty')}")
+        _LOGGER.debug("Set Voltalis appliance programming %s", programming_id)
 
+        manualsetting_json = kwargs.get("json") or {}
+        appliance = self._appliances.get(manualsetting_json.get("idAppliance"))
         await self.async_send_request(
-            f"{CONST.MANUAL_SETTING_URL}/{programming_id}",
-            retry=False,
+            f"{self._get_site(appliance).manualsetting_url}/{programming_id}",
             method=CONST.HTTPMethod.PUT,
             **kwargs,
         )
 
+        # Apply the accepted setting at once, the next refresh confirms it
+        if appliance is not None:
+            appliance.apply_manualsetting(manualsetting_json)
+
+    async def async_queue_manualsetting(
+        self, programming_id: int, json: dict[str, Any]
+    ) -> None:
+        """Queue a Voltalis appliance manual setting and wait until it is sent.
+
+        Writes queued together are sent as one batch, a later write to the
+        same manual setting replaces an earlier one still waiting.
+        """
+        await self._write_queue.async_submit(programming_id, json)
+
+    async def async_queue_manualsettings(
+        self, manualsettings: Iterable[dict[str, Any]]
+    ) -> dict[int, BaseException | None]:
+        """Queue the manual settings of many appliances in one batch.
+
+        Return the error of each appliance id, None when its write succeeded.
+        """
+        manualsettings = list(manualsettings)
+        results = await asyncio.gather(
+            *(
+                self.async_queue_manualsetting(manualsetting["id"], manualsetting)
+                for manualsetting in manualsettings
+            ),
+            return_exceptions=True,
+        )
+        return {
+            manualsetting["idAppliance"]: result
+            for manualsetting, result in zip(manualsettings, results)
+        }
+
+    async def _async_send_manualsetting(
+        self, programming_id: int, json: dict[str, Any]
+    ) -> None:
+        """Send a queued manual setting."""
+        await self.async_set_manualsetting(programming_id, json=json)
+
     async def async_set_default_program_state(
         self,
         program_id: int,
         **kwargs: Any,
     ) -> None:
         """Set Voltalis default program state."""
-        _LOGGER.debug(f"Set Voltalis default program state for {program_id}")
-        _LOGGER.debug(f"json = {kwargs.get('json','empty')}")
+        _LOGGER.debug("Set Voltalis default program state for %s", program_id)
 
         await self.async_send_request(
-            f"{CONST.QUICK_SETTINGS_URL}/{program_id}/enable",
-            retry=False,
+            f"{self._get_site(self._programs.get(program_id)).quicksettings_url}"
+            f"/{program_id}/enable",
             method=CONST.HTTPMethod.PUT,
             **kwargs,
         )
 
+        program_json = kwargs.get("json")
+        if program_json and "enabled" in program_json and program_id in self._programs:
+            self._programs[program_id].apply_enabled(program_json["enabled"])
+
     async def async_set_user_program_state(
         self,
         program_id: int,
         **kwargs: Any,
     ) -> None:
         """Set Voltalis user program state."""
-        _LOGGER.debug(f"Set Voltalis user program state for {program_id}")
-        _LOGGER.debug(f"json = {kwargs.get('json','empty')}")
+        _LOGGER.debug("Set Voltalis user program state for %s", program_id)
 
         await self.async_send_request(
-            f"{CONST.PROGRAMMING_PROGRAMS_URL}/{program_id}",
-            retry=False,
+            f"{self._get_site(self._programs.get(program_id)).programs_url}/{program_id}",
             method=CONST.HTTPMethod.PUT,
             **kwargs,
         )
 
+        program_json = kwargs.get("json")
+        if program_json and "enabled" in program_json and program_id in self._programs:
+            self._programs[program_id].apply_enabled(program_json["enabled"])
+
     async def async_send_request(
         self,
         url: str,
         headers: dict[str, str] | None = None,
         method: CONST.HTTPMethod = CONST.HTTPMethod.GET,
         retry: bool = True,
+        on_item: Callable[[Any], None] | None = None,
+        cache: bool = True,
         **kwargs: Any,
     ) -> Any:
-        """Send http requests to Voltalis."""
+        """Send http requests to Voltalis.
 
-        if len(self.cache(CONST.AUTH_TOKEN)) == 0 and url != CONST.LOGIN_URL:
-            await self.async_login()
+        Every attempt waits for the rate limiter budget first and is
+        recorded in the request statistics. Failed
+        requests are sent again as decided by the retry policy, unless
+        retry is False. GET requests are revalidated against the
+        response cache unless cache is False, a 304 answer returns the
+        previously parsed object.
+
+        With on_item, a JSON array answer is decoded one item at a time
+        and each item is passed to on_item instead of being returned, a 304
+        answer returns True as the items passed before are still current.
+        """
 
         headers = headers if headers else {}
-        if len(self.cache(CONST.AUTH_TOKEN)) > 0:
-            headers["Authorization"] = f"Bearer {self.cache(CONST.AUTH_TOKEN)}"
         headers["content-type"] = "application/json"
         headers["accept"] = "*/*"
 
-        # Replace url placeholder
-        if url.rfind("__site__") > 0:
-            url = url.replace("__site__", str(self.cache(CONST.DEFAULT_SITE_ID)))
+        authenticate = url != CONST.LOGIN_URL
+        if self._base_url != CONST.BASE_URL and url.startswith(CONST.BASE_URL):
+            url = self._base_url + url[len(CONST.BASE_URL) :]
 
-        _LOGGER.debug("Call Voltalise API")
+        cache_entry = None
+        use_cache = cache and method == CONST.HTTPMethod.GET
+        if use_cache:
+            cache_entry = self._response_cache.lookup(url)
+            # A streamed answer is not kept, only its validators are
+            if cache_entry is not None and (
+                on_item is not None or cache_entry.data is not None
+            ):
+                headers.update(conditional_headers(cache_entry))
+            else:
+                cache_entry = None
 
-        try:
-            response = await self._session.request(
-                method.value,
-                url,
-                headers=headers,
-                timeout=ClientTimeout(30),
-                **kwargs,
-            )
-            if response.status == 401:
-                raise VoltalisAuthenticationException(await response.text())
-            if response.status == 404:
-                _LOGGER.exception(await response.text())
-                return None
-            response.raise_for_status()
-        except (ClientConnectorError, ClientError, ClientResponseError) as ex:
-            if retry:
-                await self.async_login()
-                return await self.async_send_request(
-                    url, headers=headers, method=method, retry=False, **kwargs
-                )
-            raise VoltalisException from ex
-
-        _LOGGER.debug("End call to Voltalise API")
+        if authenticate:
+            # Never dump the credentials of the login request
+            self._payload_log.log("Request", method.value, url, kwargs.get("json"))
+        weight = self._rate_limiter.get_weight(method, url)
+        relogged = False
+        attempt = 0
+        while True:
+            token = ""
+            if authenticate:
+                token = await self._token_manager.async_get_token()
+                headers["Authorization"] = f"Bearer {token}"
 
-        if response.content_type == "application/json":
-            return await response.json()
+            await self._rate_limiter.async_acquire(weight)
+            retries = attempt
+            status = None
+            size = 0
+            cache_hit = False
+            start = time.monotonic()
+            try:
+                async with self._request_semaphore:
+                    # Time the exchange only, not the wait for a free slot
+                    start = time.monotonic()
+                    async with self._session.request(
+                        method.value,
+                        url,
+                        headers=headers,
+                        timeout=ClientTimeout(30),
+                        **kwargs,
+                    ) as response:
+                        status = response.status
+                        if response.status == 401:
+                            if authenticate and not relogged:
+                                # The token expired or was revoked, login once again
+                                _LOGGER.debug("Token rejected, login again")
+                                self._token_manager.invalidate(token)
+                                relogged = True
+                                continue
+                            raise VoltalisAuthenticationException(await response.text())
+                        if response.status == 304 and cache_entry is not None:
+                            _LOGGER.debug("Voltalis API answer not modified")
+                            cache_hit = True
+                            data = self._response_cache.hit(url, cache_entry)
+                            # Streamed items are not kept, the ones passed are current
+                            return True if on_item is not None else data
+                        if response.status == 404:
+                            _LOGGER.exception(await response.text())
+                            return None
+                        response.raise_for_status()
+                        is_json = response.content_type == "application/json"
+                        response_headers = response.headers
+                        if is_json and on_item is not None:
+                            data = None
+                            async for item in async_iter_json_array(response.content):
+                                on_item(item)
+                            size = response.content.total_bytes
+                        else:
+                            # Read the body once and decode the bytes directly
+                            data = await response.read()
+                            size = len(data)
+                            if is_json:
+                                data = self._json_loads(data)
+            except ValueError as ex:
+                raise VoltalisException(f"Invalid answer from {url}") from ex
+            except (ClientError, asyncio.TimeoutError) as ex:
+                attempt += 1
+                delay = self._retry_policy.get_delay(attempt, ex) if retry else None
+                if delay is None:
+                    raise VoltalisException from ex
+                _LOGGER.debug("Request failed (%s), retry in %.2fs", ex, delay)
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                latency = time.monotonic() - start
+                self._request_stats.record(
+                    url, method.value, status, latency, size, retries, cache_hit
+                )
+                _LOGGER.debug(
+                    "%s %s answered %s in %.3fs", method.value, url, status, latency
+                )
+            break
 
-        return await response.read()
+        if authenticate:
+            self._payload_log.log("Response", method.value, url, data)
+        if use_cache and is_json:
+            self._response_cache.store(url, response_headers, data)
+        return data
@@ -2,35 +2,111 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from .models import VoltalisApplianceDict, VoltalisApplianceProgrammingDict
+from .refresh import VoltalisHealth
 
 if TYPE_CHECKING:
     from . import Voltalis
+    from .site import VoltalisSite
 
 _LOGGER = logging.getLogger(__name__)
 
+APPLIANCE_FIELDS = (
+    "id",
+    "name",
+    "applianceType",
+    "modulatorType",
+    "availableModes",
+    "voltalisVersion",
+    "heatingLevel",
+)
+
+PROGRAMMING_FIELDS = (
+    "progType",
+    "progName",
+    "idManualSetting",
+    "isOn",
+    "untilFurtherNotice",
+    "mode",
+    "idPlanning",
+    "endDate",
+    "temperatureTarget",
+    "defaultTemperature",
+)
+
+MANUAL_SETTING_FIELDS = (
+    "isOn",
+    "untilFurtherNotice",
+    "mode",
+    "endDate",
+    "temperatureTarget",
+)
+
+
+def _update_fields(model: Any, fields: tuple[str, ...], json: dict[str, Any]) -> bool:
+    """Copy the payload fields to the model, return True if any changed."""
+    changed = False
+    for field in fields:
+        value = json.get(field)
+        if getattr(model, field) != value:
+            setattr(model, field, value)
+            changed = True
+    return changed
+
 
 class VoltalisAppliance:
-    """Class to represent each Voltalis appliance."""
+    """Class to represent each Voltalis appliance.
+
+    The payload is parsed once into attributes, the raw json is only kept
+    when the client is built with keep_json=True.
+    """
+
+    __slots__ = (
+        "_voltalis",
+        "_site",
+        "_appliance_json",
+        "_programming",
+        *APPLIANCE_FIELDS,
+        "idManualSetting",
+        "isReachable",
+        "health",
+    )
 
     _voltalis: Voltalis
-    _appliance_json: VoltalisApplianceDict
+    _site: VoltalisSite
+    _appliance_json: VoltalisApplianceDict | None
     _programming: VoltalisApplianceProgramming
+    id: int
+    name: str
+    applianceType: str
+    modulatorType: str
+    availableModes: list[str]
+    voltalisVersion: str
+    heatingLevel: int
     idManualSetting: int
     isReachable: bool
+    health: VoltalisHealth
 
     def __init__(
-        self, appliance_json: VoltalisApplianceDict, voltalis: Voltalis
+        self,
+        appliance_json: VoltalisApplianceDict,
+        voltalis: Voltalis,
+        site: VoltalisSite,
     ) -> None:
         """Set up Voltalis appliance."""
         self._voltalis = voltalis
-        self._appliance_json = appliance_json
+        self._site = site
+        for field in APPLIANCE_FIELDS:
+            setattr(self, field, appliance_json.get(field))
+        self._appliance_json = appliance_json if voltalis.keep_json else None
         self._programming = VoltalisApplianceProgramming(
             programming_json=appliance_json["programming"], voltalisAppliance=self
         )
         self.idManualSetting = 0
+        self.isReachable = True
+        self.health = VoltalisHealth()
 
     async def async_update(
         self,
@@ -38,60 +114,103 @@ class VoltalisAppliance:
         """Update appliance throught Voltalis API."""
         await self._voltalis.async_update_appliance(appliance_id=self.id)
 
-    @property
-    def id(self) -> int:
-        """Get appliance id."""
-        return self._appliance_json["id"]
-
-    @property
-    def name(self) -> str:
-        """Get appliance name."""
-        return self._appliance_json["name"]
+    def update_json(self, appliance_json: VoltalisApplianceDict) -> bool:
+        """Update appliance and programming in place from a new payload.
 
-    @property
-    def applianceType(self) -> str:
-        """Get appliance type."""
-        return self._appliance_json["applianceType"]
-    
-    @property
-    def modulatorType(self) -> str:
-        """Get modulator type."""
-        return self._appliance_json["modulatorType"]
-
-    @property
-    def availableModes(self) -> []:
-        """Get available modes."""
-        return self._appliance_json["availableModes"]
+        Return True if any field differs from the current ones.
+        """
+        if appliance_json is self._appliance_json:
+            # Not modified answer, the cached payload is already applied
+            return False
+        changed = _update_fields(self, APPLIANCE_FIELDS, appliance_json)
+        changed |= self._programming.update_json(appliance_json["programming"])
+        if self._appliance_json is not None:
+            self._appliance_json = appliance_json
+        return changed
 
     @property
-    def voltalisVersion(self) -> []:
-        """Get voltalis version."""
-        return self._appliance_json["voltalisVersion"]
-
-    @property
-    def heatingLevel(self) -> []:
-        """Get heating level."""
-        return self._appliance_json["heatingLevel"]
-
-    @property
-    def programming(self) -> []:
+    def programming(self) -> VoltalisApplianceProgramming:
         """Get programming."""
         return self._programming
 
     @property
-    def api(self) -> []:
+    def api(self) -> Voltalis:
         """Get Voltalis api."""
         return self._voltalis
 
-    def get_json(self) -> []:
+    @property
+    def site(self) -> VoltalisSite:
+        """Get the site of the appliance."""
+        return self._site
+
+    def build_manualsetting(self, **changes: Any) -> dict[str, Any]:
+        """Build a manual setting request body from the current state.
+
+        Keyword arguments override the matching fields of the body.
+        """
+        manualsetting_json = {
+            "id": self.idManualSetting,
+            "enabled": True,
+            "idAppliance": self.id,
+            "applianceName": self.name,
+            "applianceType": self.applianceType,
+            "untilFurtherNotice": self._programming.untilFurtherNotice,
+            "mode": self._programming.mode,
+            "heatingLevel": self.heatingLevel,
+            "endDate": self._programming.endDate,
+            "temperatureTarget": self._programming.temperatureTarget,
+            "isOn": self._programming.isOn,
+        }
+        manualsetting_json.update(changes)
+        return manualsetting_json
+
+    def apply_manualsetting(self, manualsetting_json: dict[str, Any]) -> None:
+        """Apply a manual setting accepted by the API to the programming.
+
+        A disabled manual setting gives the control back to the program,
+        which is only known after the next refresh.
+        """
+        if not manualsetting_json.get("enabled"):
+            return
+        programming = self._programming
+        programming.progType = "MANUAL"
+        programming.idManualSetting = manualsetting_json["id"]
+        for field in MANUAL_SETTING_FIELDS:
+            if field in manualsetting_json:
+                setattr(programming, field, manualsetting_json[field])
+        # The raw payload no longer matches the model
+        if self._appliance_json is not None:
+            self._appliance_json = self.to_json()
+
+    def to_json(self) -> VoltalisApplianceDict:
+        """Build the appliance json from the parsed fields."""
+        appliance_json = {field: getattr(self, field) for field in APPLIANCE_FIELDS}
+        appliance_json["programming"] = self._programming.to_json()
+        return appliance_json
+
+    def get_json(self) -> VoltalisApplianceDict:
         """Get appliance json."""
-        return self._appliance_json
+        if self._appliance_json is not None:
+            return self._appliance_json
+        return self.to_json()
 
 
 class VoltalisApplianceProgramming:
     """Class to represent each Voltalis appliance programming."""
 
+    __slots__ = ("_appliance", *PROGRAMMING_FIELDS)
+
     _appliance: VoltalisAppliance
+    progType: str
+    progName: str
+    idManualSetting: int
+    isOn: bool
+    untilFurtherNotice: bool
+    mode: str
+    idPlanning: int
+    endDate: str
+    temperatureTarget: float
+    defaultTemperature: float
 
     def __init__(
         self,
@@ -99,59 +218,18 @@ class VoltalisApplianceProgramming:
         voltalisAppliance: VoltalisAppliance,
     ) -> None:
         """Set up Voltalis appliance programming."""
-        self._programming_json = programming_json
         self._appliance = voltalisAppliance
+        for field in PROGRAMMING_FIELDS:
+            setattr(self, field, programming_json.get(field))
 
-    @property
-    def progType(self) -> str:
-        """Get prog type."""
-        return self._programming_json["progType"]
-
-    @property
-    def progName(self) -> str:
-        """Get prog name."""
-        return self._programming_json["progName"]
+    def update_json(self, programming_json: VoltalisApplianceProgrammingDict) -> bool:
+        """Update programming in place, return True if any field changed."""
+        return _update_fields(self, PROGRAMMING_FIELDS, programming_json)
 
-    @property
-    def idManualSetting(self) -> int:
-        """Get idManualSetting."""
-        return self._programming_json["idManualSetting"]
-
-    @property
-    def isOn(self) -> bool:
-        """Get isOn."""
-        return self._programming_json["isOn"]
-
-    @property
-    def untilFurtherNotice(self) -> str:
-        """Get untilFurtherNotice."""
-        return self._programming_json["untilFurtherNotice"]
-
-    @property
-    def mode(self) -> str:
-        """Get mode."""
-        return self._programming_json["mode"]
-
-    @property
-    def idPlanning(self) -> int:
-        """Get idPlanning."""
-        return self._programming_json["idPlanning"]
-
-    @property
-    def endDate(self) -> str:
-        """Get endDate."""
-        return self._programming_json["endDate"]
-
-    @property
-    def temperatureTarget(self) -> float:
-        """Get temperatureTarget."""
-        return self._programming_json["temperatureTarget"]
-
-    @property
-    def defaultTemperature(self) -> float:
-        """Get defaultTemperature."""
-        return self._programming_json["defaultTemperature"]
+    def to_json(self) -> VoltalisApplianceProgrammingDict:
+        """Build the programming json from the parsed fields."""
+        return {field: getattr(self, field) for field in PROGRAMMING_FIELDS}
 
-    def get_json(self) -> []:
+    def get_json(self) -> VoltalisApplianceProgrammingDict:
         """Get programming json."""
-        return self._programming_json
+        return self.to_json()
@@ -0,0 +1,113 @@
+"""The token manager used by aiovoltalis."""
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import Awaitable, Callable
+import json
+import logging
+import time
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisTokenManager:
+    """Class to manage the lifecycle of the Voltalis authentication token."""
+
+    def __init__(
+        self,
+        login: Callable[[], Awaitable[str]],
+        refresh_margin: float = CONST.TOKEN_REFRESH_MARGIN,
+        default_lifetime: float = CONST.DEFAULT_TOKEN_LIFETIME,
+    ) -> None:
+        """Set up the token manager.
+
+        login is a coroutine function performing the login request and
+        returning the new token.
+        """
+        self._login = login
+        self._refresh_margin = refresh_margin
+        self._default_lifetime = default_lifetime
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._login_task: asyncio.Task[str] | None = None
+
+    @property
+    def token(self) -> str:
+        """Get the current token."""
+        return self._token
+
+    @property
+    def expires_at(self) -> float:
+        """Get the token expiry as a unix timestamp."""
+        return self._expires_at
+
+    @property
+    def is_valid(self) -> bool:
+        """Return True if the token can be used without refreshing it."""
+        return len(self._token) > 0 and time.time() < self._refresh_at
+
+    def set_token(self, token: str) -> None:
+        """Store a new token and compute its expiry.
+
+        The token is refreshed refresh_margin seconds before it expires, or
+        halfway through its lifetime when that is shorter.
+        """
+        now = time.time()
+        self._token = token
+        self._expires_at = _decode_expiry(token) or now + self._default_lifetime
+        lifetime = max(0.0, self._expires_at - now)
+        self._refresh_at = self._expires_at - min(self._refresh_margin, lifetime / 2)
+        _LOGGER.debug("New token valid until %s", self._expires_at)
+
+    def clear(self) -> None:
+        """Forget the current token."""
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+
+    def invalidate(self, token: str) -> None:
+        """Forget the token if it is still the one rejected by the API.
+
+        Requests sent with an older token must not drop a token renewed in
+        the meantime by another request.
+        """
+        if token == self._token:
+            self.clear()
+
+    async def async_get_token(self) -> str:
+        """Get a valid token, logging in first when needed."""
+        if self.is_valid:
+            return self._token
+        return await self.async_refresh()
+
+    async def async_refresh(self) -> str:
+        """Login and return the new token.
+
+        Only one login runs at a time, concurrent callers share its result.
+        """
+        if self._login_task is None:
+            self._login_task = asyncio.create_task(self._async_login())
+        return await asyncio.shield(self._login_task)
+
+    async def _async_login(self) -> str:
+        """Run the login and store its token."""
+        try:
+            token = await self._login()
+            self.set_token(token)
+            return token
+        finally:
+            self._login_task = None
+
+
+def _decode_expiry(token: str) -> float | None:
+    """Get the expiry of a JWT token, None if it can not be decoded."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,125 @@
+"""The appliance circuit breaker used by aiovoltalis."""
+from __future__ import annotations
+
+import logging
+import time
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisCircuit:
+    """Class to represent the circuit of one appliance."""
+
+    __slots__ = ("unreachable", "failures", "probes", "next_probe")
+
+    def __init__(self) -> None:
+        """Set up a closed circuit."""
+        self.unreachable = False
+        self.failures = 0
+        self.probes = 0
+        self.next_probe = 0.0
+
+
+class VoltalisCircuitBreaker:
+    """Class to stop polling the appliances that do not answer.
+
+    The circuit of an appliance opens when the autodiag reports it
+    unreachable or after failure_threshold failed requests in a row. An
+    open circuit only lets a probe through after base_delay seconds,
+    doubled after each probe up to max_delay, and closes again once the
+    appliance is reachable and answers.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CONST.CIRCUIT_FAILURE_THRESHOLD,
+        base_delay: float = CONST.CIRCUIT_BASE_DELAY,
+        max_delay: float = CONST.CIRCUIT_MAX_DELAY,
+    ) -> None:
+        """Set up the circuit breaker with every circuit closed."""
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._circuits: dict[int, VoltalisCircuit] = {}
+
+    def _is_open(self, circuit: VoltalisCircuit) -> bool:
+        """Return True if a circuit is open."""
+        return circuit.unreachable or circuit.failures >= self.failure_threshold
+
+    def is_open(self, appliance_id: int) -> bool:
+        """Return True if the circuit of an appliance is open."""
+        circuit = self._circuits.get(appliance_id)
+        return circuit is not None and self._is_open(circuit)
+
+    @property
+    def open_circuits(self) -> list[int]:
+        """Get the ids of the appliances with an open circuit."""
+        return [
+            appliance_id
+            for appliance_id, circuit in self._circuits.items()
+            if self._is_open(circuit)
+        ]
+
+    def _update(
+        self, appliance_id: int, unreachable: bool | None, failed: bool | None
+    ) -> bool | None:
+        """Update a circuit, return True if it opened, False if it closed."""
+        circuit = self._circuits.get(appliance_id)
+        if circuit is None:
+            if not unreachable and not failed:
+                return None
+            circuit = self._circuits[appliance_id] = VoltalisCircuit()
+        was_open = self._is_open(circuit)
+        if unreachable is not None:
+            circuit.unreachable = unreachable
+        if failed is not None:
+            circuit.failures = circuit.failures + 1 if failed else 0
+        is_open = self._is_open(circuit)
+        if is_open == was_open:
+            return None
+        if is_open:
+            circuit.probes = 0
+            circuit.next_probe = time.monotonic() + self.base_delay
+        else:
+            del self._circuits[appliance_id]
+        return is_open
+
+    def record_reachable(self, appliance_id: int, reachable: bool) -> bool | None:
+        """Record the autodiag status of an appliance.
+
+        Return True if the circuit opened, False if it closed, else None.
+        """
+        return self._update(appliance_id, not reachable, None)
+
+    def record_success(self, appliance_id: int) -> bool | None:
+        """Record an answer of an appliance, see record_reachable."""
+        return self._update(appliance_id, None, False)
+
+    def record_failure(self, appliance_id: int) -> bool | None:
+        """Record a failed request of an appliance, see record_reachable."""
+        return self._update(appliance_id, None, True)
+
+    def allow(self, appliance_id: int, now: float | None = None) -> bool:
+        """Return True if an appliance can be polled now.
+
+        An open circuit lets one probe through when it is due and
+        schedules the next one.
+        """
+        circuit = self._circuits.get(appliance_id)
+        if circuit is None or not self._is_open(circuit):
+            return True
+        now = time.monotonic() if now is None else now
+        if now < circuit.next_probe:
+            return False
+        circuit.probes += 1
+        circuit.next_probe = now + min(
+            self.max_delay, self.base_delay * 2**circuit.probes
+        )
+        _LOGGER.debug(
+            "Probe Voltalis appliance %s, next probe in %.0fs",
+            appliance_id,
+            circuit.next_probe - now,
+        )
+        return True
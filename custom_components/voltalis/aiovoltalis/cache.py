@@ -0,0 +1,92 @@
+"""The response cache used by aiovoltalis."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import logging
+import time
+from typing import Any, NamedTuple
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisCacheEntry(NamedTuple):
+    """Class to represent a cached response."""
+
+    etag: str | None
+    last_modified: str | None
+    data: Any
+    stored_at: float
+
+
+class VoltalisResponseCache:
+    """Class to cache GET responses and revalidate them with conditional requests.
+
+    Entries are keyed by resolved url, dropped once older than ttl seconds
+    and evicted least recently used first above max_entries.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CONST.RESPONSE_CACHE_TTL,
+        max_entries: int = CONST.RESPONSE_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Set up an empty response cache."""
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, VoltalisCacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of cached responses."""
+        return len(self._entries)
+
+    def lookup(self, url: str) -> VoltalisCacheEntry | None:
+        """Get the cached response of url, None if missing or expired."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at > self._ttl:
+            del self._entries[url]
+            return None
+        return entry
+
+    def hit(self, url: str, entry: VoltalisCacheEntry) -> Any:
+        """Record a 304 Not Modified answer and return the cached data."""
+        self.hits += 1
+        if url in self._entries:
+            self._entries.move_to_end(url)
+        return entry.data
+
+    def store(self, url: str, headers: Mapping[str, str], data: Any) -> None:
+        """Record a full answer and cache it if it can be revalidated."""
+        self.misses += 1
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            self._entries.pop(url, None)
+            return
+
+        self._entries[url] = VoltalisCacheEntry(
+            etag, last_modified, data, time.monotonic()
+        )
+        self._entries.move_to_end(url)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+
+
+def conditional_headers(entry: VoltalisCacheEntry) -> dict[str, str]:
+    """Get the headers revalidating a cached response."""
+    headers = {}
+    if entry.etag is not None:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified is not None:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
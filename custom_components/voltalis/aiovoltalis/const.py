@@ -23,7 +23,64 @@ MANUAL_SETTING_URL = BASE_URL + "/api/site/__site__/manualsetting"
 PROGRAMMING_PROGRAMS_URL = BASE_URL + "/api/site/__site__/programming/program"
 QUICK_SETTINGS_URL = BASE_URL + "/api/site/__site__/quicksettings"
 AUTODIAG_URL = BASE_URL + "/api/site/__site__/autodiag"
+CONSUMPTION_URL = BASE_URL + "/api/site/__site__/consumption/realtime"
+CONSUMPTION_HISTORY_URL = BASE_URL + "/api/site/__site__/consumption/history"
+
+# Refresh
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# Above this many appliances, refresh them from the collection endpoint
+BULK_REFRESH_THRESHOLD = 3
+
+# Write queue
+WRITE_DEBOUNCE_DELAY = 0.5
+
+# Retry
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+RETRY_JITTER = 0.5
+RETRY_MAX_PER_CYCLE = 10
+
+# Circuit breaker, delays are in seconds
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BASE_DELAY = 60
+CIRCUIT_MAX_DELAY = 3600
+
+# Rate limit, request weights are in tokens
+RATE_LIMIT_RATE = 5.0
+RATE_LIMIT_BURST = 60
+RATE_LIMIT_WEIGHTS = {"read": 1, "write": 2, "login": 5}
+# Weights of single endpoints, keyed by method and path with ids as {id}
+RATE_LIMIT_ENDPOINT_WEIGHTS = {
+    "POST /auth/login": 5,
+    "GET /api/site/{id}/managed-appliance": 2,
+    "GET /api/site/{id}/consumption/history": 3,
+}
+
+# Request statistics
+REQUEST_STATS_MAX_RECORDS = 2048
+REQUEST_STATS_WINDOW = 3600
+
+# Streamed JSON decoding
+STREAM_CHUNK_SIZE = 16384
+
+# Consumption, in seconds per step and points per series
+CONSUMPTION_STEP = 600
+CONSUMPTION_MODE = "TEN_MINUTES"
+CONSUMPTION_MAX_POINTS = 144
+CONSUMPTION_BUFFER_SIZE = 144
+CONSUMPTION_HISTORY_MODE = "HOUR"
+
+# Payload logging
+PAYLOAD_LOG_MAX_LENGTH = 2000
+
+# Authentication
+TOKEN_REFRESH_MARGIN = 300
+DEFAULT_TOKEN_LIFETIME = 3600
+
+# Response cache
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_MAX_ENTRIES = 1024
 
 # Cache
-AUTH_TOKEN = "auth_token"
 DEFAULT_SITE_ID = "default_site_id"
@@ -0,0 +1,187 @@
+"""The consumption models used by aiovoltalis."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timezone
+import logging
+from typing import Any, NamedTuple
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an API UTC date to a POSIX timestamp."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Format a POSIX timestamp as an API UTC date."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+class VoltalisConsumptionSample(NamedTuple):
+    """Class to represent the consumption of one step, in Wh."""
+
+    timestamp: float
+    total: float
+    appliances: dict[int, float]
+
+
+def parse_samples(consumption_json: dict[str, Any]) -> list[VoltalisConsumptionSample]:
+    """Get the samples of a consumption answer, oldest first."""
+    samples = [
+        VoltalisConsumptionSample(
+            parse_timestamp(sample["stepTimestampInUtc"]),
+            sample["totalConsumptionInWh"],
+            {
+                appliance_json["csApplianceId"]: appliance_json["consumptionInWh"]
+                for appliance_json in sample.get("appliances", [])
+            },
+        )
+        for sample in consumption_json["consumptions"]
+    ]
+    samples.sort(key=lambda sample: sample.timestamp)
+    return samples
+
+
+class VoltalisConsumptionBuffer:
+    """Class to keep the last samples of a consumption series.
+
+    Timestamps and values are stored in two fixed size arrays of doubles
+    used as a ring, 16 bytes per sample whatever the history length.
+    """
+
+    __slots__ = ("_timestamps", "_values", "_start", "_size")
+
+    def __init__(self, capacity: int = CONST.CONSUMPTION_BUFFER_SIZE) -> None:
+        """Set up an empty buffer."""
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Get the number of samples kept."""
+        return self._size
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Get the timestamp of the newest sample."""
+        if not self._size:
+            return None
+        return self._timestamps[self._index(self._size - 1)]
+
+    @property
+    def last_value(self) -> float | None:
+        """Get the value of the newest sample."""
+        if not self._size:
+            return None
+        return self._values[self._index(self._size - 1)]
+
+    def _index(self, position: int) -> int:
+        """Get the array index of the sample at a position, oldest first."""
+        return (self._start + position) % len(self._values)
+
+    def add(self, timestamp: float, value: float) -> float:
+        """Add a sample, or update the newest one if it has the same timestamp.
+
+        Samples older than the newest one are ignored, and so is a newest
+        sample revised down, the totals built on it only increase. Return
+        the value added to the series.
+        """
+        last_timestamp = self.last_timestamp
+        if last_timestamp is not None and timestamp < last_timestamp:
+            return 0.0
+        if timestamp == last_timestamp:
+            index = self._index(self._size - 1)
+            delta = value - self._values[index]
+            if delta < 0:
+                _LOGGER.debug(
+                    "Ignore consumption at %s revised down from %s to %s Wh",
+                    format_timestamp(timestamp),
+                    self._values[index],
+                    value,
+                )
+                return 0.0
+            self._values[index] = value
+            return delta
+        if self._size < len(self._values):
+            index = self._index(self._size)
+            self._size += 1
+        else:
+            index = self._start
+            self._start = self._index(1)
+        self._timestamps[index] = timestamp
+        self._values[index] = value
+        return value
+
+    def samples(self) -> list[tuple[float, float]]:
+        """Get the samples kept, oldest first."""
+        return [
+            (self._timestamps[self._index(position)], self._values[self._index(position)])
+            for position in range(self._size)
+        ]
+
+    def sum(self, since: float) -> float:
+        """Get the sum of the values of the samples since a timestamp."""
+        return sum(value for timestamp, value in self.samples() if timestamp >= since)
+
+
+class VoltalisConsumption:
+    """Class to represent the consumption of a site and of its appliances.
+
+    Totals are in Wh and count everything fetched since the client
+    started, the buffers keep the recent samples.
+    """
+
+    __slots__ = ("step", "total", "samples", "appliance_totals", "appliance_samples")
+
+    def __init__(self) -> None:
+        """Set up an empty consumption."""
+        self.step: int = CONST.CONSUMPTION_STEP
+        self.total: float | None = None
+        self.samples = VoltalisConsumptionBuffer()
+        self.appliance_totals: dict[int, float] = {}
+        self.appliance_samples: dict[int, VoltalisConsumptionBuffer] = {}
+
+    @property
+    def cursor(self) -> float | None:
+        """Get the timestamp of the newest sample fetched."""
+        return self.samples.last_timestamp
+
+    def points_since_cursor(self, now: float) -> int:
+        """Get the number of points to fetch to catch up with now.
+
+        The newest step is fetched again as it may have grown since.
+        """
+        if self.cursor is None:
+            return 1
+        missing = int((now - self.cursor) // self.step) + 1
+        return max(1, min(missing, CONST.CONSUMPTION_MAX_POINTS))
+
+    def update_json(self, consumption_json: dict[str, Any]) -> bool:
+        """Add the samples of a consumption answer, return True if any is new."""
+        self.step = consumption_json.get("aggregationStepInSeconds", self.step)
+        changed = False
+        for sample in parse_samples(consumption_json):
+            if self.cursor is not None and sample.timestamp < self.cursor:
+                continue
+            delta = self.samples.add(sample.timestamp, sample.total)
+            self.total = (self.total or 0.0) + delta
+            changed |= bool(delta)
+            for appliance_id, value in sample.appliances.items():
+                samples = self.appliance_samples.get(appliance_id)
+                if samples is None:
+                    samples = self.appliance_samples[appliance_id] = (
+                        VoltalisConsumptionBuffer()
+                    )
+                delta = samples.add(sample.timestamp, value)
+                self.appliance_totals[appliance_id] = (
+                    self.appliance_totals.get(appliance_id, 0.0) + delta
+                )
+                changed |= bool(delta)
+        return changed
@@ -0,0 +1,109 @@
+"""The JSON decoding used by aiovoltalis."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+import codecs
+import json
+import logging
+from typing import Any
+
+from aiohttp import StreamReader
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def json_loads(data: bytes) -> Any:
+        """Decode a JSON body with orjson."""
+        return orjson.loads(data)
+
+except ImportError:  # pragma: no cover
+    json_loads = json.loads
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonArrayParser:
+    """Class to decode the items of a JSON array fed in pieces."""
+
+    __slots__ = ("_decoder", "_buffer", "_expect")
+
+    def __init__(self) -> None:
+        """Set up the parser before the opening bracket."""
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        # One of "[", "first" (an item or "]"), "item", "separator" or "done"
+        self._expect = "["
+
+    def feed(self, text: str, final: bool = False) -> Iterator[Any]:
+        """Add text and yield the items it completes.
+
+        An item ending at the end of the text may go on in the next piece,
+        a number for one, so it is only decoded once more text follows or
+        when final is True.
+        """
+        buffer = self._buffer + text
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if self._expect == "[":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                self._expect = "first"
+                position += 1
+            elif self._expect == "separator" or (
+                self._expect == "first" and char == "]"
+            ):
+                if char == "]":
+                    self._expect = "done"
+                elif char == "," and self._expect == "separator":
+                    self._expect = "item"
+                else:
+                    raise ValueError(f"Expected ',' or ']' at {char!r}")
+                position += 1
+            elif self._expect == "done":
+                raise ValueError("Data after the JSON array")
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # The item goes on in the next piece
+                    break
+                if end == len(buffer) and not final:
+                    break
+                position = end
+                self._expect = "separator"
+                yield item
+        self._buffer = buffer[position:]
+
+    def close(self) -> None:
+        """Check the array was complete."""
+        if self._expect != "done":
+            raise ValueError("Truncated JSON array")
+
+
+async def async_iter_json_array(
+    stream: StreamReader, chunk_size: int = CONST.STREAM_CHUNK_SIZE
+) -> AsyncIterator[Any]:
+    """Decode a JSON array body one item at a time.
+
+    Only the item being decoded and the unread part of the current chunk
+    are held in memory, never the whole body.
+    """
+    parser = _JsonArrayParser()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in stream.iter_chunked(chunk_size):
+        for item in parser.feed(text_decoder.decode(chunk)):
+            yield item
+    for item in parser.feed(text_decoder.decode(b"", final=True), final=True):
+        yield item
+    parser.close()
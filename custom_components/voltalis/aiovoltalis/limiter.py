@@ -0,0 +1,119 @@
+"""The request rate limiter used by aiovoltalis."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from . import const as CONST
+from .stats import endpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisRateLimiter:
+    """Class to keep the request rate of the client within a budget.
+
+    A token bucket refilled with rate tokens per second and holding up to
+    burst tokens. Every request takes the weight of its endpoint, or of its
+    class (read, write or login) when the endpoint has none. Requests over
+    budget wait in line instead of being sent.
+    """
+
+    def __init__(
+        self,
+        rate: float = CONST.RATE_LIMIT_RATE,
+        burst: float = CONST.RATE_LIMIT_BURST,
+        weights: dict[str, float] | None = None,
+        endpoint_weights: dict[str, float] | None = None,
+    ) -> None:
+        """Set up the rate limiter with a full bucket.
+
+        endpoint_weights keys are like "GET /api/site/{id}/autodiag".
+        """
+        self.rate = rate
+        self.burst = burst
+        self.weights = weights if weights else dict(CONST.RATE_LIMIT_WEIGHTS)
+        self.endpoint_weights = (
+            endpoint_weights
+            if endpoint_weights is not None
+            else dict(CONST.RATE_LIMIT_ENDPOINT_WEIGHTS)
+        )
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._queue_depth = 0
+        self._queued_weight = 0.0
+        self._throttle_count = 0
+        self._throttle_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Get the number of requests waiting for the budget."""
+        return self._queue_depth
+
+    @property
+    def throttle_count(self) -> int:
+        """Get the number of requests that had to wait."""
+        return self._throttle_count
+
+    @property
+    def throttle_time(self) -> float:
+        """Get the total time in seconds spent waiting for the budget."""
+        return self._throttle_time
+
+    def get_weight(self, method: CONST.HTTPMethod, url: str) -> float:
+        """Get the weight of a request."""
+        weight = self.endpoint_weights.get(f"{method.value} {endpoint(url)}")
+        if weight is not None:
+            return weight
+        if url.endswith(CONST.LOGIN_URL[len(CONST.BASE_URL) :]):
+            return self.weights["login"]
+        if method != CONST.HTTPMethod.GET:
+            return self.weights["write"]
+        return self.weights["read"]
+
+    def estimate_delay(self, weight: float) -> float:
+        """Get the seconds requests of this total weight would wait for the budget.
+
+        The requests already waiting in line are served first.
+        """
+        tokens = min(
+            self.burst, self._tokens + (time.monotonic() - self._updated_at) * self.rate
+        )
+        return max(0.0, (self._queued_weight + weight - tokens) / self.rate)
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def async_acquire(self, weight: float) -> None:
+        """Wait until the budget allows a request of this weight.
+
+        Requests are served in the order they arrived.
+        """
+        weight = min(weight, self.burst)
+        self._queue_depth += 1
+        self._queued_weight += weight
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < weight:
+                    delay = (weight - self._tokens) / self.rate
+                    self._throttle_count += 1
+                    self._throttle_time += delay
+                    _LOGGER.debug(
+                        "Request budget exhausted, wait %.2fs (%d queued)",
+                        delay,
+                        self._queue_depth - 1,
+                    )
+                    await asyncio.sleep(delay)
+                    self._refill()
+                self._tokens -= weight
+        finally:
+            self._queue_depth -= 1
+            self._queued_weight -= weight
@@ -0,0 +1,52 @@
+"""The payload logging used by aiovoltalis."""
+from __future__ import annotations
+
+import logging
+import random
+from typing import Any
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(f"{__package__}.payload")
+
+
+class VoltalisPayloadLog:
+    """Class to dump request and response payloads, off by default.
+
+    Payloads go to their own logger so they can be switched on at runtime
+    without turning on DEBUG for the whole library. Only a sample_rate
+    share of the payloads is dumped, truncated to max_length characters.
+    Nothing is formatted unless a payload is actually logged.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        max_length: int = CONST.PAYLOAD_LOG_MAX_LENGTH,
+    ) -> None:
+        """Set up the payload log."""
+        self.sample_rate = sample_rate
+        self.max_length = max_length
+        self._random = random.Random()
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if payloads are logged."""
+        return _LOGGER.isEnabledFor(logging.DEBUG)
+
+    def enable(self, sample_rate: float = 1.0) -> None:
+        """Start logging a sample_rate share of the payloads."""
+        self.sample_rate = sample_rate
+        _LOGGER.setLevel(logging.DEBUG)
+
+    def disable(self) -> None:
+        """Stop logging payloads, the logger level is left to the host again."""
+        _LOGGER.setLevel(logging.NOTSET)
+
+    def log(self, message: str, method: str, url: str, payload: Any) -> None:
+        """Log a payload if enabled and sampled."""
+        if payload is None or not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return
+        _LOGGER.debug("%s %s %s: %.*s", message, method, url, self.max_length, payload)
@@ -1,21 +1,23 @@
 """Models for Voltalis."""
 from __future__ import annotations
 
+from typing import TypedDict
 
-class VoltalisApplianceDict(dict):
+
+class VoltalisApplianceDict(TypedDict):
     """Class for Voltalis appliance Dict."""
 
     id: int
     name: str
     applianceType: str
     modulatorType: str
-    availableModes: []
+    availableModes: list[str]
     voltalisVersion: str
     programming: VoltalisApplianceProgrammingDict
     heatingLevel: int
 
 
-class VoltalisApplianceProgrammingDict(dict):
+class VoltalisApplianceProgrammingDict(TypedDict):
     """Class for Voltalis appliance programming Dict."""
 
     progType: str
@@ -25,11 +27,12 @@ class VoltalisApplianceProgrammingDict(dict):
     untilFurtherNotice: bool
     mode: str
     idPlanning: int
-    endDate: str
+    endDate: str | None
     temperatureTarget: float
     defaultTemperature: float
 
-class VoltalisProgramDict(dict):
+
+class VoltalisProgramDict(TypedDict):
     """Class for Voltalis program Dict."""
 
     id: int
@@ -6,9 +6,11 @@ import logging
 from typing import TYPE_CHECKING
 
 from .models import VoltalisProgramDict
+from .refresh import VoltalisHealth
 
 if TYPE_CHECKING:
     from . import Voltalis
+    from .site import VoltalisSite
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,19 +20,48 @@ class ProgramType(Enum):
     USER = "USER"
 
 class VoltalisProgram:
-    """Class to represent each Voltalis program."""
+    """Class to represent each Voltalis program.
+
+    The payload is parsed once into attributes, the raw json is only kept
+    when the client is built with keep_json=True.
+    """
+
+    __slots__ = (
+        "_voltalis",
+        "_site",
+        "_program_json",
+        "_program_type",
+        "id",
+        "name",
+        "isEnabled",
+        "health",
+    )
 
     _voltalis: Voltalis
-    _program_json: VoltalisProgramDict
+    _site: VoltalisSite
+    _program_json: VoltalisProgramDict | None
     _program_type: ProgramType
+    id: int
+    name: str
+    isEnabled: bool
+    health: VoltalisHealth
 
     def __init__(
-        self, appliance_json: VoltalisProgramDict, voltalis: Voltalis, _program_type: ProgramType
+        self,
+        appliance_json: VoltalisProgramDict,
+        voltalis: Voltalis,
+        _program_type: ProgramType,
+        site: VoltalisSite,
     ) -> None:
         """Set up Voltalis appliance."""
         self._voltalis = voltalis
-        self._program_json = appliance_json
+        self._site = site
         self._program_type = _program_type
+        self.id = appliance_json["id"]
+        self.name = appliance_json.get("name")
+        self.isEnabled = appliance_json.get("enabled")
+        self._program_json = appliance_json if voltalis.keep_json else None
+        self.health = VoltalisHealth()
 
     async def async_update(
         self,
@@ -39,27 +70,49 @@ class VoltalisProgram:
         if self._program_type == ProgramType.USER:
             await self._voltalis.async_update_user_program(program_id=self.id)
 
-    @property
-    def id(self) -> int:
-        """Get appliance id."""
-        return self._program_json["id"]
+    def update_json(self, program_json: VoltalisProgramDict) -> bool:
+        """Update program in place from a new payload.
 
-    @property
-    def name(self) -> str:
-        """Get appliance name."""
-        return self._program_json["name"]
+        Return True if any field differs from the current ones.
+        """
+        if program_json is self._program_json:
+            return False
+        name = program_json.get("name")
+        is_enabled = program_json.get("enabled")
+        changed = name != self.name or is_enabled != self.isEnabled
+        self.name = name
+        self.isEnabled = is_enabled
+        if self._program_json is not None:
+            self._program_json = program_json
+        return changed
+
+    def apply_enabled(self, enabled: bool) -> None:
+        """Apply a program state accepted by the API."""
+        self.isEnabled = enabled
+        if self._program_json is not None:
+            self._program_json = self.to_json()
 
     @property
-    def isEnabled(self) -> bool:
-        """Get appliance isEnabled."""
-        return self._program_json["enabled"]
+    def programType(self) -> ProgramType:
+        """Get program type."""
+        return self._program_type
 
     @property
-    def api(self) -> []:
+    def api(self) -> Voltalis:
         """Get Voltalis api."""
         return self._voltalis
 
-    def get_json(self) -> []:
-        """Get program json"""
-        return self._program_json
+    @property
+    def site(self) -> VoltalisSite:
+        """Get the site of the program."""
+        return self._site
+
+    def to_json(self) -> VoltalisProgramDict:
+        """Build the program json from the parsed fields."""
+        return {"id": self.id, "name": self.name, "enabled": self.isEnabled}
 
+    def get_json(self) -> VoltalisProgramDict:
+        """Get program json."""
+        if self._program_json is not None:
+            return self._program_json
+        return self.to_json()
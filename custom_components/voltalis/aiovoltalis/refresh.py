@@ -0,0 +1,151 @@
+"""The refresh engine used by aiovoltalis."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any
+
+from .exceptions import VoltalisAuthenticationException, VoltalisException
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisHealth:
+    """Class to track the refresh results of an appliance or a program.
+
+    The item keeps its last good state when a refresh fails, it is only
+    stale once it failed since its last success and that success is older
+    than max_age seconds.
+    """
+
+    __slots__ = ("last_success", "error_count", "last_error")
+
+    def __init__(self) -> None:
+        """Set up the health of an item never refreshed."""
+        self.last_success: float | None = None
+        self.error_count = 0
+        self.last_error: str | None = None
+
+    def record_success(self, now: float | None = None) -> bool:
+        """Record a refresh success, return True if it recovers from errors."""
+        recovered = self.error_count > 0
+        self.last_success = time.time() if now is None else now
+        self.error_count = 0
+        self.last_error = None
+        return recovered
+
+    def record_failure(self, error: BaseException) -> None:
+        """Record a refresh failure."""
+        self.error_count += 1
+        cause = error.__cause__ if error.__cause__ is not None else error
+        self.last_error = str(error) or type(cause).__name__
+
+    def is_stale(self, max_age: float, now: float | None = None) -> bool:
+        """Return True if the item failed and has no recent success."""
+        if not self.error_count:
+            return False
+        if self.last_success is None:
+            return True
+        return (time.time() if now is None else now) - self.last_success > max_age
+
+
+class VoltalisChanges:
+    """Class to collect the ids of the appliances, programs and sites that changed.
+
+    Sites are listed in consumption when new consumption samples arrived.
+    """
+
+    def __init__(self) -> None:
+        """Set up an empty change set."""
+        self.appliances: set[int] = set()
+        self.programs: set[int] = set()
+        self.consumption: set[int] = set()
+
+    def __bool__(self) -> bool:
+        """Return True if anything changed."""
+        return bool(self.appliances or self.programs or self.consumption)
+
+
+class VoltalisRefreshReport:
+    """Class to represent the timings of a refresh cycle."""
+
+    def __init__(self) -> None:
+        """Set up an empty refresh report."""
+        self.duration: float = 0.0
+        self.latencies: dict[str, float] = {}
+        self.retries: int = 0
+        self.changes = VoltalisChanges()
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, BaseException] = {}
+
+    @property
+    def request_count(self) -> int:
+        """Get the number of requests of the cycle."""
+        return len(self.latencies)
+
+
+class VoltalisRefreshEngine:
+    """Class to run refresh requests concurrently.
+
+    With a stagger window, the start of the requests of a cycle is spread
+    evenly over that many seconds so they do not all hit the API at once.
+    """
+
+    def __init__(self, max_concurrency: int, stagger: float = 0.0) -> None:
+        """Set up the refresh engine."""
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._stagger = stagger
+
+    async def async_run(
+        self,
+        requests: dict[str, Callable[[], Awaitable[Any]]],
+        isolate: bool = False,
+    ) -> VoltalisRefreshReport:
+        """Run all requests, at most max_concurrency at a time.
+
+        Every request is awaited even when one of them fails, the first
+        error is raised once the whole cycle is over. With isolate, errors
+        are only kept in the report errors, unless every request failed or
+        the authentication did. The value returned by each request is kept
+        in the report results.
+        """
+        report = VoltalisRefreshReport()
+        start = time.monotonic()
+
+        async def _async_run_one(
+            index: int, label: str, request: Callable[[], Awaitable[Any]]
+        ):
+            if self._stagger:
+                await asyncio.sleep(self._stagger * index / len(requests))
+            async with self._semaphore:
+                request_start = time.monotonic()
+                try:
+                    report.results[label] = await request()
+                finally:
+                    report.latencies[label] = time.monotonic() - request_start
+
+        results = await asyncio.gather(
+            *(
+                _async_run_one(index, label, request)
+                for index, (label, request) in enumerate(requests.items())
+            ),
+            return_exceptions=True,
+        )
+        report.duration = time.monotonic() - start
+
+        for label, result in zip(requests, results):
+            if isinstance(result, BaseException):
+                report.errors[label] = result
+
+        for error in report.errors.values():
+            if (
+                not isolate
+                or len(report.errors) == len(requests)
+                or isinstance(error, VoltalisAuthenticationException)
+                or not isinstance(error, VoltalisException)
+            ):
+                raise error
+
+        return report
@@ -0,0 +1,98 @@
+"""The retry policy used by aiovoltalis."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+
+from aiohttp.client_exceptions import ClientConnectionError, ClientResponseError
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisRetryPolicy:
+    """Class to decide if and when a failed request is sent again.
+
+    Subclass it, or pass another instance to Voltalis, to change how
+    errors are classified or how long to wait between attempts.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = CONST.RETRY_MAX_ATTEMPTS,
+        base_delay: float = CONST.RETRY_BASE_DELAY,
+        max_delay: float = CONST.RETRY_MAX_DELAY,
+        jitter: float = CONST.RETRY_JITTER,
+        max_retries_per_cycle: int = CONST.RETRY_MAX_PER_CYCLE,
+    ) -> None:
+        """Set up the retry policy."""
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_retries_per_cycle = max_retries_per_cycle
+        self._retries_left = max_retries_per_cycle
+
+    @property
+    def retries_left(self) -> int:
+        """Get the number of retries left in the current cycle."""
+        return self._retries_left
+
+    def start_cycle(self) -> None:
+        """Reset the retry budget at the beginning of a refresh cycle."""
+        self._retries_left = self.max_retries_per_cycle
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Return True if the request may succeed when sent again."""
+        if isinstance(error, ClientResponseError):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, asyncio.TimeoutError | ClientConnectionError)
+
+    def get_delay(self, attempt: int, error: BaseException) -> float | None:
+        """Get the delay before the next attempt, None to give up.
+
+        attempt is the number of attempts already made.
+        """
+        if (
+            attempt >= self.max_attempts
+            or self._retries_left <= 0
+            or not self.is_retryable(error)
+        ):
+            return None
+
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(delay * (1 - self.jitter), delay)
+
+        retry_after = _parse_retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                # The server asks for more than we can wait within a cycle
+                return None
+            delay = max(delay, retry_after)
+
+        self._retries_left -= 1
+        return delay
+
+
+def _parse_retry_after(error: BaseException) -> float | None:
+    """Get the Retry-After header of an error response in seconds."""
+    if not isinstance(error, ClientResponseError) or not error.headers:
+        return None
+    value = error.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,73 @@
+"""The Site class used by aiovoltalis."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from . import const as CONST
+from .consumption import VoltalisConsumption
+
+if TYPE_CHECKING:
+    from .appliance import VoltalisAppliance
+    from .program import VoltalisProgram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _site_url(template: str, base_url: str, site_id: int) -> str:
+    """Build a site url from a url template."""
+    return base_url + template[len(CONST.BASE_URL) :].replace("__site__", str(site_id))
+
+
+class VoltalisSite:
+    """Class to represent each home of the Voltalis account.
+
+    The urls of the site are built once, every site keeps its own
+    appliances and programs.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "isDefault",
+        "appliance_url",
+        "manualsetting_url",
+        "programs_url",
+        "quicksettings_url",
+        "autodiag_url",
+        "consumption_url",
+        "consumption_history_url",
+        "appliances",
+        "programs",
+        "diagnostics_json",
+        "consumption",
+    )
+
+    def __init__(
+        self,
+        site_id: int,
+        name: str | None = None,
+        is_default: bool = False,
+        base_url: str = CONST.BASE_URL,
+    ) -> None:
+        """Set up Voltalis site."""
+        self.id = site_id
+        self.name = name
+        self.isDefault = is_default
+        self.appliance_url = _site_url(CONST.APPLIANCE_URL, base_url, site_id)
+        self.manualsetting_url = _site_url(CONST.MANUAL_SETTING_URL, base_url, site_id)
+        self.programs_url = _site_url(CONST.PROGRAMMING_PROGRAMS_URL, base_url, site_id)
+        self.quicksettings_url = _site_url(CONST.QUICK_SETTINGS_URL, base_url, site_id)
+        self.autodiag_url = _site_url(CONST.AUTODIAG_URL, base_url, site_id)
+        self.consumption_url = _site_url(CONST.CONSUMPTION_URL, base_url, site_id)
+        self.consumption_history_url = _site_url(
+            CONST.CONSUMPTION_HISTORY_URL, base_url, site_id
+        )
+        self.appliances: dict[int, VoltalisAppliance] = {}
+        self.programs: dict[int, VoltalisProgram] = {}
+        self.diagnostics_json: list[dict[str, Any]] | None = None
+        self.consumption = VoltalisConsumption()
+
+    def to_json(self) -> dict[str, Any]:
+        """Build the site json."""
+        return {"id": self.id, "name": self.name, "isDefault": self.isDefault}
@@ -0,0 +1,121 @@
+"""The request statistics used by aiovoltalis."""
+from __future__ import annotations
+
+from collections import deque
+import logging
+import re
+import time
+from typing import Any, NamedTuple
+from urllib.parse import urlsplit
+
+from . import const as CONST
+
+_LOGGER = logging.getLogger(__name__)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class VoltalisRequestRecord(NamedTuple):
+    """Class to represent one attempt of a request."""
+
+    timestamp: float
+    url: str
+    method: str
+    status: int | None
+    latency: float
+    size: int
+    retries: int
+    cache_hit: bool
+
+
+def endpoint(url: str) -> str:
+    """Get the endpoint of a url, with the ids replaced by {id}."""
+    return _ID_SEGMENT.sub("/{id}", urlsplit(url).path)
+
+
+class VoltalisRequestStats:
+    """Class to collect the last requests in a ring buffer.
+
+    Recording a request only appends a tuple, the statistics are computed
+    when they are read. Subclass it, or pass another instance to Voltalis,
+    to forward the records somewhere else.
+    """
+
+    def __init__(self, max_records: int = CONST.REQUEST_STATS_MAX_RECORDS) -> None:
+        """Set up an empty ring buffer."""
+        self._records: deque[VoltalisRequestRecord] = deque(maxlen=max_records)
+        self._total = 0
+
+    def __len__(self) -> int:
+        """Get the number of records kept."""
+        return len(self._records)
+
+    @property
+    def total(self) -> int:
+        """Get the number of requests recorded since the start."""
+        return self._total
+
+    @property
+    def records(self) -> list[VoltalisRequestRecord]:
+        """Get the records kept, oldest first."""
+        return list(self._records)
+
+    def record(
+        self,
+        url: str,
+        method: str,
+        status: int | None,
+        latency: float,
+        size: int = 0,
+        retries: int = 0,
+        cache_hit: bool = False,
+    ) -> None:
+        """Record one attempt of a request, status is None on transport errors."""
+        self._total += 1
+        self._records.append(
+            VoltalisRequestRecord(
+                time.time(), url, method, status, latency, size, retries, cache_hit
+            )
+        )
+
+    def summary(self, window: float = CONST.REQUEST_STATS_WINDOW) -> dict[str, Any]:
+        """Get the statistics of the requests of the last window seconds."""
+        since = time.time() - window
+        records = [record for record in self._records if record.timestamp >= since]
+        if not records:
+            return {
+                "requests": 0,
+                "calls_per_hour": 0.0,
+                "error_rate": None,
+                "latency_mean": None,
+                "latency_p95": None,
+                "cache_hit_rate": None,
+                "bytes": 0,
+                "retries": 0,
+                "endpoints": {},
+            }
+
+        errors = sum(
+            1 for record in records if record.status is None or record.status >= 400
+        )
+        latencies = sorted(record.latency for record in records)
+        endpoints: dict[str, int] = {}
+        for record in records:
+            key = f"{record.method} {endpoint(record.url)}"
+            endpoints[key] = endpoints.get(key, 0) + 1
+        covered = window
+        if len(records) == self._records.maxlen:
+            # The buffer holds less than a window, extrapolate the rate
+            covered = min(window, max(time.time() - records[0].timestamp, 1.0))
+        return {
+            "requests": len(records),
+            "calls_per_hour": len(records) * 3600 / covered,
+            "error_rate": errors / len(records),
+            "latency_mean": sum(latencies) / len(latencies),
+            "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "cache_hit_rate": sum(record.cache_hit for record in records)
+            / len(records),
+            "bytes": sum(record.size for record in records),
+            "retries": sum(1 for record in records if record.retries),
+            "endpoints": endpoints,
+        }
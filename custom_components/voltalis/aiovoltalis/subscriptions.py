@@ -0,0 +1,71 @@
+"""The change subscriptions used by aiovoltalis."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+from .refresh import VoltalisChanges
+
+_LOGGER = logging.getLogger(__name__)
+
+# Topics are the id sets of VoltalisChanges
+TOPICS = ("appliances", "programs", "consumption")
+
+
+class VoltalisSubscriptions:
+    """Class to call back the subscribers of the ids that changed.
+
+    Subscribers register for one id of a topic. Dispatching a change set
+    walks the changed ids only, so its cost follows the number of changes,
+    not the number of subscribers.
+    """
+
+    def __init__(self) -> None:
+        """Set up an empty registry."""
+        self._subscribers: dict[str, dict[int, list[Callable[[], None]]]] = {
+            topic: {} for topic in TOPICS
+        }
+
+    def __len__(self) -> int:
+        """Get the number of subscriptions."""
+        return sum(
+            len(callbacks)
+            for subscribers in self._subscribers.values()
+            for callbacks in subscribers.values()
+        )
+
+    def subscribe(
+        self, topic: str, item_id: int, callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Call back on the changes of an id, return the function to unsubscribe."""
+        subscribers = self._subscribers[topic]
+        subscribers.setdefault(item_id, []).append(callback)
+
+        def unsubscribe() -> None:
+            """Stop calling back."""
+            callbacks = subscribers[item_id]
+            callbacks.remove(callback)
+            if not callbacks:
+                del subscribers[item_id]
+
+        return unsubscribe
+
+    def dispatch(self, changes: VoltalisChanges) -> int:
+        """Call back the subscribers of the changed ids, return how many."""
+        count = 0
+        for topic, subscribers in self._subscribers.items():
+            for item_id in getattr(changes, topic):
+                for callback in subscribers.get(item_id, ()):
+                    callback()
+                    count += 1
+        return count
+
+    def dispatch_all(self) -> int:
+        """Call back every subscriber, return how many."""
+        count = 0
+        for subscribers in self._subscribers.values():
+            for callbacks in subscribers.values():
+                for callback in callbacks:
+                    callback()
+                    count += 1
+        return count
@@ -0,0 +1,121 @@
+"""The manual setting write queue used by aiovoltalis."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from . import const as CONST
+from .exceptions import VoltalisException
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisWriteQueue:
+    """Class to batch the manual setting writes of many appliances.
+
+    Writes submitted within delay seconds are sent together, with at most
+    max_concurrency requests in flight. Only the last write of each manual
+    setting is sent, every caller gets its result. Batch listeners are
+    called once per batch with the ids of the appliances written.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[int, dict[str, Any]], Awaitable[None]],
+        delay: float = CONST.WRITE_DEBOUNCE_DELAY,
+        max_concurrency: int = CONST.DEFAULT_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        """Set up the write queue.
+
+        send is a coroutine function sending one manual setting.
+        """
+        self._send = send
+        self._delay = delay
+        self._max_concurrency = max_concurrency
+        self._pending: dict[int, tuple[dict[str, Any], list[asyncio.Future]]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._batch_listeners: list[Callable[[set[int]], Awaitable[None]]] = []
+
+    @property
+    def pending(self) -> int:
+        """Get the number of manual settings waiting to be sent."""
+        return len(self._pending)
+
+    def add_batch_listener(
+        self, listener: Callable[[set[int]], Awaitable[None]]
+    ) -> Callable[[], None]:
+        """Register a coroutine function called after each batch.
+
+        Return a callable removing the listener.
+        """
+        self._batch_listeners.append(listener)
+        return lambda: self._batch_listeners.remove(listener)
+
+    async def async_submit(self, programming_id: int, body: dict[str, Any]) -> None:
+        """Queue a manual setting and wait until it is sent.
+
+        Writes are merged by manual setting id, an appliance without a known
+        manual setting (id 0) would be merged with every other one.
+        """
+        if not programming_id:
+            raise VoltalisException(
+                f"No manual setting known for appliance {body.get('idAppliance')}"
+            )
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if programming_id in self._pending:
+            _LOGGER.debug("Replace queued manual setting %s", programming_id)
+            self._pending[programming_id][1].append(future)
+            self._pending[programming_id] = (body, self._pending[programming_id][1])
+        else:
+            self._pending[programming_id] = (body, [future])
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._delay, self._start_flush)
+
+        await future
+
+    def _start_flush(self) -> None:
+        """Send the queued manual settings in the background."""
+        self._flush_handle = None
+        task = asyncio.get_running_loop().create_task(self._async_flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _async_flush(self) -> None:
+        """Send a batch and notify the batch listeners."""
+        batch, self._pending = self._pending, {}
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        written: set[int] = set()
+
+        async def _async_send_one(
+            programming_id: int, body: dict[str, Any], futures: list[asyncio.Future]
+        ) -> None:
+            async with semaphore:
+                try:
+                    await self._send(programming_id, body)
+                except Exception as err:  # pylint: disable=broad-except
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(err)
+                    return
+            if "idAppliance" in body:
+                written.add(body["idAppliance"])
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+        _LOGGER.debug("Send a batch of %d manual settings", len(batch))
+        await asyncio.gather(
+            *(
+                _async_send_one(programming_id, body, futures)
+                for programming_id, (body, futures) in batch.items()
+            )
+        )
+
+        if written:
+            for listener in list(self._batch_listeners):
+                await listener(written)
@@ -0,0 +1,270 @@
+"""Backfill of the Voltalis consumption into the long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+import logging
+import time
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+
+from .aiovoltalis import Voltalis
+from .aiovoltalis.consumption import VoltalisConsumptionSample
+from .aiovoltalis.exceptions import VoltalisException
+from .aiovoltalis.site import VoltalisSite
+from .const import (
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_SETTLE_HOURS,
+    BACKFILL_UPDATE_MINUTE,
+    DOMAIN,
+    EVENT_BACKFILL_PROGRESS,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+
+def statistic_id(site_id: int, appliance_id: int | None = None) -> str:
+    """Get the id of the long-term statistic of a site or an appliance."""
+    if appliance_id is None:
+        return f"{DOMAIN}:site_{site_id}_consumption"
+    return f"{DOMAIN}:appliance_{appliance_id}_consumption"
+
+
+def backfill_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Get the store of the resume cursors of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.backfill")
+
+
+class VoltalisBackfill:
+    """Page the hourly consumption history into the long-term statistics.
+
+    The statistics are external ones (see statistic_id), separate from the
+    statistics the recorder compiles for the consumption sensors, which
+    only start when the sensors were created and cannot take older hours
+    without breaking their sums. Once a site is backfilled, its series is
+    continued every hour, so it is the one to use in the energy dashboard.
+
+    The history of every site is fetched in chunks of BACKFILL_CHUNK_DAYS,
+    BACKFILL_CONCURRENCY chunks at a time, through the rate limiter of the
+    client. Each window of chunks is inserted with one call per statistic,
+    then the resume cursor and the running sums are saved, so a cancelled
+    or failed job goes on from there the next time. The cursor follows the
+    last hour received, not the hours asked for, and the last
+    BACKFILL_SETTLE_HOURS are left to the next run, so the hours the API
+    has not published yet are asked again. The history only grows forward
+    from the first hour backfilled, the statistic sums depend on it.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, api: Voltalis) -> None:
+        """Set up an idle backfill."""
+        self._hass = hass
+        self._entry = entry
+        self._api = api
+        self._store = backfill_store(hass, entry)
+        self._task: asyncio.Task | None = None
+        self._state: dict[str, Any] = {"cursors": {}, "sums": {}}
+        self.progress: dict[str, Any] = {
+            "running": False,
+            "done": 0,
+            "total": 0,
+            "error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Return True if a backfill job is running."""
+        return self._task is not None and not self._task.done()
+
+    @callback
+    def async_track_hours(self) -> CALLBACK_TYPE:
+        """Continue the backfilled series every hour, return the function to stop."""
+        return async_track_time_change(
+            self._hass, self._async_continue, minute=BACKFILL_UPDATE_MINUTE, second=0
+        )
+
+    @callback
+    def _async_continue(self, now: datetime) -> None:
+        """Import the hours elapsed since the last job."""
+        self.async_start(None)
+
+    @callback
+    def async_start(self, days: int | None) -> bool:
+        """Start a job over the last days, return False if one is running.
+
+        With days None, only the sites already backfilled are continued
+        from their cursor.
+        """
+        if self.running:
+            return False
+        self._task = self._entry.async_create_background_task(
+            self._hass,
+            self._async_run(days),
+            f"{DOMAIN} {self._entry.entry_id} backfill",
+        )
+        return True
+
+    async def async_cancel(self) -> bool:
+        """Cancel the running job, return False if there is none."""
+        if not self.running:
+            return False
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        return True
+
+    @callback
+    def _async_update_progress(self, **progress: Any) -> None:
+        """Update the progress and tell the listeners."""
+        self.progress.update(progress)
+        self._hass.bus.async_fire(
+            EVENT_BACKFILL_PROGRESS,
+            {"entry_id": self._entry.entry_id, **self.progress},
+        )
+
+    async def _async_run(self, days: int | None) -> None:
+        """Run the job."""
+        if (state := await self._store.async_load()) is not None:
+            self._state = state
+        end = (time.time() // HOUR - BACKFILL_SETTLE_HOURS) * HOUR
+
+        chunk = BACKFILL_CHUNK_DAYS * DAY
+        plan: list[tuple[VoltalisSite, list[tuple[float, float]]]] = []
+        for site in self._api.sites:
+            cursor = self._state["cursors"].get(str(site.id))
+            if days is not None:
+                cursor = max(end - days * DAY, cursor or 0)
+            elif cursor is None:
+                continue
+            chunks = []
+            while cursor < end:
+                chunks.append((cursor, min(cursor + chunk, end)))
+                cursor += chunk
+            if chunks:
+                plan.append((site, chunks))
+        if days is None and not plan:
+            return
+
+        done = 0
+        self._async_update_progress(
+            running=True,
+            done=done,
+            total=sum(len(chunks) for _, chunks in plan),
+            error=None,
+        )
+        try:
+            for site, chunks in plan:
+                for index in range(0, len(chunks), BACKFILL_CONCURRENCY):
+                    window = chunks[index : index + BACKFILL_CONCURRENCY]
+                    results = await self._async_fetch(site, window)
+                    samples = [
+                        sample
+                        for (chunk_start, chunk_end), chunk_samples in zip(
+                            window, results
+                        )
+                        for sample in chunk_samples
+                        if chunk_start <= sample.timestamp < chunk_end
+                    ]
+                    sums = self._async_insert(site, samples)
+                    cursors = dict(self._state["cursors"])
+                    if samples:
+                        cursors[str(site.id)] = (
+                            max(sample.timestamp for sample in samples) + HOUR
+                        )
+                    state = {"cursors": cursors, "sums": sums}
+                    await self._store.async_save(state)
+                    self._state = state
+                    done += len(window)
+                    self._async_update_progress(done=done)
+        except VoltalisException as err:
+            _LOGGER.error("Voltalis consumption backfill failed: %s", err)
+            self._async_update_progress(error=str(err))
+        else:
+            _LOGGER.log(
+                logging.DEBUG if days is None else logging.INFO,
+                "Voltalis consumption backfill done, %d chunks",
+                done,
+            )
+        finally:
+            self._async_update_progress(running=False)
+
+    async def _async_fetch(
+        self, site: VoltalisSite, window: list[tuple[float, float]]
+    ) -> list[list[VoltalisConsumptionSample]]:
+        """Fetch the chunks of a window concurrently.
+
+        The first failure cancels the other chunks before it is raised.
+        """
+        tasks = [
+            asyncio.create_task(
+                self._api.async_get_consumption_history(site, chunk_start, chunk_end)
+            )
+            for chunk_start, chunk_end in window
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    @callback
+    def _async_insert(
+        self, site: VoltalisSite, samples: list[VoltalisConsumptionSample]
+    ) -> dict[str, float]:
+        """Add the hourly samples of a site to the long-term statistics.
+
+        Return the new running sums, the saved ones are left untouched.
+        """
+        # Series of the site under None, then of each appliance
+        series: dict[int | None, list[tuple[float, float]]] = {}
+        for sample in samples:
+            series.setdefault(None, []).append((sample.timestamp, sample.total))
+            for appliance_id, value in sample.appliances.items():
+                series.setdefault(appliance_id, []).append((sample.timestamp, value))
+
+        sums = dict(self._state["sums"])
+        for appliance_id, values in series.items():
+            series_id = statistic_id(site.id, appliance_id)
+            if appliance_id is None:
+                name = site.name or f"Voltalis site {site.id}"
+            elif appliance_id in site.appliances:
+                name = site.appliances[appliance_id].name
+            else:
+                name = f"Voltalis appliance {appliance_id}"
+            statistics = []
+            for timestamp, value in values:
+                sums[series_id] = sums.get(series_id, 0.0) + value
+                statistics.append(
+                    StatisticData(
+                        start=datetime.fromtimestamp(timestamp, timezone.utc),
+                        state=value,
+                        sum=sums[series_id],
+                    )
+                )
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{name} consumption",
+                    source=DOMAIN,
+                    statistic_id=series_id,
+                    unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+                ),
+                statistics,
+            )
+        return sums
@@ -38,7 +38,7 @@ async def async_setup_entry(
     entities = []
     for appliance in controller.appliances:
         if appliance.applianceType == VOLTALIS_HEATER_TYPE:
-            entities.append(VoltalisClimate(controller.coordinator, appliance))
+            entities.append(VoltalisClimate(controller, appliance))
     async_add_entities(entities)
 
 
@@ -57,9 +57,9 @@ class VoltalisClimate(VoltalisEntity, ClimateEntity):
     )
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
 
-    def __init__(self, coordinator, appliance):
+    def __init__(self, controller, appliance):
         """Initialize the entity."""
-        super().setupAppliance(coordinator, appliance)
+        super().setupAppliance(controller, appliance)
 
     @property
     def icon(self) -> str:
@@ -98,19 +98,7 @@ class VoltalisClimate(VoltalisEntity, ClimateEntity):
             "Set Voltalis appliance %s HVAC Mode to %s", self.appliance.id, hvac_mode
         )
 
-        curjson = {
-            "id": self.appliance.idManualSetting,
-            "enabled": True,
-            "idAppliance": self.appliance.id,
-            "applianceName": self.appliance.name,
-            "applianceType": self.appliance.applianceType,
-            "untilFurtherNotice": self.appliance.programming.untilFurtherNotice,
-            "mode": self.appliance.programming.mode,
-            "heatingLevel": self.appliance.heatingLevel,
-            "endDate": self.appliance.programming.endDate,
-            "temperatureTarget": self.appliance.programming.temperatureTarget,
-            "isOn": self.appliance.programming.isOn,
-        }
+        curjson = self.appliance.build_manualsetting()
 
         if hvac_mode == HVACMode.HEAT:
             # HVACMode.HEAT -> Manual setting enable: off, untilFurtherNotice: true
@@ -129,8 +117,10 @@ class VoltalisClimate(VoltalisEntity, ClimateEntity):
             # unsupported mode
             return
 
-        await self.appliance.api.async_set_manualsetting(json=curjson, programming_id=self.appliance.idManualSetting)
-        await self.coordinator.async_request_refresh()
+        await self.appliance.api.async_queue_manualsetting(
+            json=curjson, programming_id=self.appliance.idManualSetting
+        )
+        self.async_write_ha_state()
 
     @property
     def min_temp(self) -> float:
@@ -161,41 +151,28 @@ class VoltalisClimate(VoltalisEntity, ClimateEntity):
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         temperature = kwargs[ATTR_TEMPERATURE]
-        request_body = {
-            "id": self.appliance.idManualSetting,
-            "enabled": True,
-            "idAppliance": self.appliance.id,
-            "applianceName": self.appliance.name,
-            "applianceType": self.appliance.applianceType,
-            "untilFurtherNotice": True,
-            "mode": "TEMPERATURE",
-            "heatingLevel": self.appliance.heatingLevel,
-            "endDate": None,
-            "temperatureTarget": temperature,
-            "isOn": True,
-        }
-        await self.appliance.api.async_set_manualsetting(
+        request_body = self.appliance.build_manualsetting(
+            untilFurtherNotice=True,
+            mode="TEMPERATURE",
+            endDate=None,
+            temperatureTarget=temperature,
+            isOn=True,
+        )
+        await self.appliance.api.async_queue_manualsetting(
             json=request_body, programming_id=self.appliance.idManualSetting
         )
-        await self.coordinator.async_request_refresh()
+        self.async_write_ha_state()
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Activate the specified preset mode."""
 
-        request_body = {
-            "id": self.appliance.idManualSetting,
-            "enabled": True,
-            "idAppliance": self.appliance.id,
-            "applianceName": self.appliance.name,
-            "applianceType": self.appliance.applianceType,
-            "untilFurtherNotice": True,
-            "mode": VOLTALIS_PRESET_MODES[preset_mode],
-            "heatingLevel": self.appliance.heatingLevel,
-            "endDate": None,
-            "temperatureTarget": self.appliance.programming.temperatureTarget,
-            "isOn": True,
-        }
-        await self.appliance.api.async_set_manualsetting(
+        request_body = self.appliance.build_manualsetting(
+            untilFurtherNotice=True,
+            mode=VOLTALIS_PRESET_MODES[preset_mode],
+            endDate=None,
+            isOn=True,
+        )
+        await self.appliance.api.async_queue_manualsetting(
             json=request_body, programming_id=self.appliance.idManualSetting
         )
-        await self.coordinator.async_request_refresh()
+        self.async_write_ha_state()
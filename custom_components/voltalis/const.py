@@ -12,6 +12,14 @@ DEFAULT_NAME = "Voltalis"
 DOMAIN = "voltalis"
 
 VOLTALIS_CONTROLLER = "voltalis_controller"
+VOLTALIS_CLIENT_POOL = "voltalis_client_pool"
+
+SERVICE_SET_ZONE = "set_zone"
+SERVICE_SET_PAYLOAD_LOGGING = "set_payload_logging"
+SERVICE_BACKFILL_CONSUMPTION = "backfill_consumption"
+SERVICE_CANCEL_BACKFILL = "cancel_backfill"
+
+EVENT_BACKFILL_PROGRESS = "voltalis_backfill_progress"
 
 VOLTALIS_HEATER_TYPE = "HEATER"
 VOLTALIS_WATERHEATER_TYPE = "WATER_HEATER"
@@ -33,7 +41,34 @@ HA_PRESET_MODES = {
 }
 
 SCAN_INTERVAL = 60
+AUTODIAG_INTERVAL = 300
+USER_PROGRAMS_INTERVAL = 900
+QUICK_SETTINGS_INTERVAL = 300
+CONSUMPTION_INTERVAL = 300
+FAST_SCAN_INTERVAL = 10
+FAST_POLL_WINDOW = 60
+MIN_SCAN_INTERVAL = 5
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_BACKOFF = 4
+REFRESH_COOLDOWN = 2
 POLLING_TIMEOUT = 10
+# An appliance or program failing for that long is unavailable
+STALE_AFTER = 600
+MAX_CONCURRENT_REQUESTS = 4
+POOL_MAX_CONCURRENT_REQUESTS = 8
+POOL_TICK_SPACING = 2
+REQUEST_STAGGER = 1
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+BACKFILL_DEFAULT_DAYS = 30
+BACKFILL_MAX_DAYS = 365
+BACKFILL_CHUNK_DAYS = 7
+BACKFILL_CONCURRENCY = 2
+BACKFILL_SETTLE_HOURS = 2
+# Minute of every hour the backfilled series are continued at
+BACKFILL_UPDATE_MINUTE = 10
 
 DEFAULT_MIN_TEMP = 7
 DEFAULT_MAX_TEMP = 24
@@ -1,16 +1,17 @@
 """Interface to the Voltalis API."""
 
 import asyncio
+from collections.abc import Iterable
 from datetime import timedelta
 import logging
+import time
+from typing import Any
 
-from aiohttp import client_exceptions
-
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .aiovoltalis import (
@@ -18,7 +19,20 @@ from .aiovoltalis import (
     VoltalisAuthenticationException,
     VoltalisException,
 )
-from .const import DOMAIN, POLLING_TIMEOUT, SCAN_INTERVAL
+from .aiovoltalis.appliance import VoltalisAppliance
+from .aiovoltalis.refresh import VoltalisChanges, VoltalisRefreshReport
+from .aiovoltalis.subscriptions import VoltalisSubscriptions
+from .backfill import VoltalisBackfill
+from .const import (
+    DOMAIN,
+    POLLING_TIMEOUT,
+    REFRESH_COOLDOWN,
+    SCAN_INTERVAL,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .pool import async_get_client_pool
+from .scheduler import VoltalisPollClass, VoltalisPollScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,39 +44,47 @@ class VoltalisController:
         """Initialize an interface to Voltalis."""
         self._hass = hass
         self._voltalis = None
+        self._pool = None
         self.appliances = None
         self.programs = None
         self.coordinator = None
+        self.last_refresh_report = None
+        self._store = None
+        self.backfill = None
+        self.subscriptions = VoltalisSubscriptions()
+        self._last_update_success = True
+        self._failed_requests: set[str] = set()
+        self._initialized = False
+        self._scheduler = VoltalisPollScheduler()
+        self._pending_refresh: set[int] = set()
+        self._refresh_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=REFRESH_COOLDOWN,
+            immediate=False,
+            function=self._async_refresh_pending,
+        )
+
+    @property
+    def api(self) -> Voltalis:
+        """Get the Voltalis client."""
+        return self._voltalis
 
     async def async_setup_entry(self, entry):
         """Perform initial setup.
 
-        Authenticate, query static state, set up polling, and otherwise make
-        ready for normal operations .
+        Set up from the snapshot saved by the last run when there is one,
+        the live initialization then runs with the first coordinator
+        refresh in the background. Meanwhile the entities are available
+        with the state of the snapshot, they turn unavailable only if that
+        refresh fails. Without a snapshot the API must answer at once.
         """
-
-        try:
-            self._voltalis = Voltalis(
-                username=entry.data[CONF_EMAIL],
-                password=entry.data[CONF_PASSWORD],
-                auto_login=True,
-                session=async_get_clientsession(self._hass),
-            )
-        except VoltalisAuthenticationException as ex:
-            # credentials were changed or invalidated, we need new ones
-            raise ConfigEntryAuthFailed from ex
-        except (
-            asyncio.TimeoutError,
-            client_exceptions.ClientOSError,
-            client_exceptions.ServerDisconnectedError,
-            client_exceptions.ContentTypeError,
-        ) as err:
-            raise ConfigEntryNotReady from err
-
-        await self._voltalis.async_initialize()
-        self.appliances = await self._voltalis.async_get_appliances()
-        self.programs = await self._voltalis.async_get_programs()
-
+        self._pool = async_get_client_pool(self._hass)
+        self._voltalis = self._pool.async_get_client(entry)
+        self._store = Store(
+            self._hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+        self.backfill = VoltalisBackfill(self._hass, entry, self._voltalis)
         self.coordinator = DataUpdateCoordinator(
             self._hass,
             _LOGGER,
@@ -71,28 +93,235 @@ class VoltalisController:
             update_interval=timedelta(seconds=SCAN_INTERVAL),
         )
 
-        await self.coordinator.async_refresh()
+        if snapshot := await self._store.async_load():
+            _LOGGER.debug("Set up Voltalis from the saved snapshot")
+            self._voltalis.load_snapshot(snapshot)
+            self.appliances = self._voltalis.appliances
+            self.programs = self._voltalis.programs
+            entry.async_create_background_task(
+                self._hass,
+                self.coordinator.async_refresh(),
+                f"{DOMAIN} {entry.entry_id} initialization",
+            )
+        else:
+            await self.coordinator.async_config_entry_first_refresh()
+            self.appliances = self._voltalis.appliances
+            self.programs = self._voltalis.programs
+
+        entry.async_on_unload(self._refresh_debouncer.async_cancel)
+        entry.async_on_unload(self.backfill.async_track_hours())
+        entry.async_on_unload(
+            self.coordinator.async_add_listener(self._async_dispatch_changes)
+        )
+        entry.async_on_unload(
+            self._voltalis.write_queue.add_batch_listener(
+                self.async_request_appliance_refresh
+            )
+        )
 
         self.async_register_devices(entry)
 
         return True
 
+    async def _async_initialize(self, now: float) -> VoltalisChanges:
+        """Query the static state and save it for the next start.
+
+        The initialization polls every data class, the scheduler starts
+        counting from it.
+        """
+        async with asyncio.timeout(POLLING_TIMEOUT):
+            self.last_refresh_report = await self._voltalis.async_initialize()
+        self._initialized = True
+        self._scheduler.record_initialized(now)
+        self._schedule_next_update(now)
+        self._log_new_topology()
+        await self._store.async_save(self._voltalis.export_snapshot())
+        return self.last_refresh_report.changes
+
+    @callback
+    def _async_dispatch_changes(self) -> None:
+        """Wake up the entities of what changed.
+
+        Every entity is woken up when the availability of the API flipped.
+        """
+        if self.coordinator.last_update_success != self._last_update_success:
+            self._last_update_success = self.coordinator.last_update_success
+            self.subscriptions.dispatch_all()
+        elif self.coordinator.data is not None:
+            self.subscriptions.dispatch(self.coordinator.data)
+
+    @callback
+    def _async_save_snapshot(self) -> None:
+        """Save the reconciled topology after a while."""
+        self._store.async_delay_save(
+            self._voltalis.export_snapshot, SNAPSHOT_SAVE_DELAY
+        )
+
     async def async_update_data(self):
-        """Query the API and return the new state."""
-        try:
-            async with asyncio.timeout(POLLING_TIMEOUT):
-                for appliance in self.appliances:
-                    await appliance.async_update()
-                await self._voltalis.async_update_appliances_diagnostics()
+        """Query the API and return the appliances and programs that changed.
 
-            async with asyncio.timeout(POLLING_TIMEOUT):
-                for program in self.programs:
-                    await program.async_update()
-                await self._voltalis.async_update_default_programs()
+        Only the data classes due according to the scheduler are polled,
+        the next tick is set to the next due data class. The tick waits its
+        turn in the client pool first, to spread the entries over time.
+        """
+        await self._pool.async_wait_turn()
+        now = time.monotonic()
+        due = self._scheduler.due(now)
+        try:
+            if not self._initialized:
+                return await self._async_initialize(now)
+            self.last_refresh_report = await self._voltalis.async_refresh(
+                appliances=VoltalisPollClass.APPLIANCES in due,
+                diagnostics=VoltalisPollClass.DIAGNOSTICS in due,
+                user_programs=VoltalisPollClass.USER_PROGRAMS in due,
+                default_programs=VoltalisPollClass.QUICK_SETTINGS in due,
+                consumption=VoltalisPollClass.CONSUMPTION in due,
+                timeout=POLLING_TIMEOUT,
+            )
 
-        except VoltalisException as err:
+        except VoltalisAuthenticationException as err:
+            raise ConfigEntryAuthFailed from err
+        except (VoltalisException, asyncio.TimeoutError) as err:
+            self._scheduler.record_failure(due, now)
+            self._schedule_next_update(now)
             raise UpdateFailed(err) from err
 
+        self._log_failed_requests(self.last_refresh_report)
+        self._scheduler.record_success(
+            due,
+            self.last_refresh_report.changes,
+            self.last_refresh_report.retries > 0
+            or bool(self.last_refresh_report.errors),
+            now,
+        )
+        self._schedule_next_update(now)
+        changes = self.last_refresh_report.changes
+        if changes.appliances or changes.programs:
+            self._async_save_snapshot()
+        return self.last_refresh_report.changes
+
+    def _log_failed_requests(self, report: VoltalisRefreshReport) -> None:
+        """Warn once about each request that starts failing.
+
+        A request stays failing until it succeeds again, the cycles that
+        skip it, as the circuit breaker does, do not count.
+        """
+        failed = {
+            label: str(error) or type(error).__name__
+            for label, error in report.errors.items()
+            if label not in self._failed_requests
+        }
+        recovered = self._failed_requests.intersection(report.results)
+        self._failed_requests = (self._failed_requests - recovered) | set(report.errors)
+        if failed:
+            _LOGGER.warning(
+                "Voltalis refresh failed for %s, their last state is kept: %s",
+                ", ".join(failed),
+                failed,
+            )
+        if recovered:
+            _LOGGER.info("Voltalis refresh recovered for %s", ", ".join(sorted(recovered)))
+
+    def _log_new_topology(self) -> None:
+        """Warn about appliances and programs missing from the snapshot."""
+        if self.appliances is None:
+            return
+        if len(self._voltalis.appliances) != len(self.appliances) or len(
+            self._voltalis.programs
+        ) != len(self.programs):
+            _LOGGER.warning(
+                "Voltalis appliances or programs changed since the last start, "
+                "reload the integration to update the entities"
+            )
+
+    def get_appliance(self, appliance_id: int) -> VoltalisAppliance | None:
+        """Get an appliance by id."""
+        for appliance in self.appliances:
+            if appliance.id == appliance_id:
+                return appliance
+        return None
+
+    async def async_set_zone(
+        self,
+        appliances: list[VoltalisAppliance],
+        mode: str | None,
+        temperature: float | None,
+    ) -> dict[int, BaseException | None]:
+        """Apply one manual setting to many appliances in a single batch.
+
+        Return the error of each appliance id, None when it succeeded.
+        """
+        changes: dict[str, Any] = {
+            "untilFurtherNotice": True,
+            "endDate": None,
+            "isOn": True,
+        }
+        if mode is not None:
+            changes["mode"] = mode
+        elif temperature is not None:
+            changes["mode"] = "TEMPERATURE"
+        if temperature is not None:
+            changes["temperatureTarget"] = temperature
+
+        results = await self._voltalis.async_queue_manualsettings(
+            appliance.build_manualsetting(**changes) for appliance in appliances
+        )
+
+        # Publish the optimistic state of the appliances written
+        written = VoltalisChanges()
+        written.appliances.update(
+            appliance_id for appliance_id, error in results.items() if error is None
+        )
+        if written:
+            self.coordinator.async_set_updated_data(written)
+        return results
+
+    @callback
+    def async_notify_write(self, written: Iterable[VoltalisPollClass]) -> None:
+        """Poll the written data classes fast to confirm a command."""
+        now = time.monotonic()
+        self._scheduler.notify_write(written, now)
+        self._schedule_next_update(now)
+
+    async def async_request_appliance_refresh(
+        self, appliance_ids: Iterable[int]
+    ) -> None:
+        """Request a refresh of appliances after a command.
+
+        Requests made within REFRESH_COOLDOWN seconds are merged into one
+        refresh of the affected appliances only.
+        """
+        self.async_notify_write([VoltalisPollClass.APPLIANCES])
+        await self.async_refresh_appliances(appliance_ids)
+
+    async def async_refresh_appliances(self, appliance_ids: Iterable[int]) -> None:
+        """Refresh appliances only, merged as in async_request_appliance_refresh."""
+        self._pending_refresh.update(appliance_ids)
+        await self._refresh_debouncer.async_call()
+
+    async def async_request_poll(self, requested: Iterable[VoltalisPollClass]) -> None:
+        """Poll data classes now, whatever their schedule."""
+        self._scheduler.request_poll(requested, time.monotonic())
+        await self.coordinator.async_request_refresh()
+
+    async def _async_refresh_pending(self) -> None:
+        """Refresh the appliances waiting for a confirmation."""
+        appliance_ids, self._pending_refresh = self._pending_refresh, set()
+        try:
+            report = await self._voltalis.async_refresh_appliances(
+                appliance_ids, timeout=POLLING_TIMEOUT
+            )
+        except (VoltalisException, asyncio.TimeoutError) as err:
+            _LOGGER.warning("Unable to refresh Voltalis appliances %s: %s", appliance_ids, err)
+            return
+        self.coordinator.async_set_updated_data(report.changes)
+
+    def _schedule_next_update(self, now: float) -> None:
+        """Wake the coordinator up when the next data class is due."""
+        self.coordinator.update_interval = timedelta(
+            seconds=self._scheduler.next_delay(now)
+        )
+
     @callback
     def async_register_devices(self, entry):
         """Register all devices."""
@@ -0,0 +1,77 @@
+"""Diagnostics support for the Voltalis integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .aiovoltalis.stats import endpoint
+from .const import DOMAIN, VOLTALIS_CONTROLLER
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+DIAGNOSTICS_RECORDS = 50
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    controller = hass.data[DOMAIN][entry.entry_id][VOLTALIS_CONTROLLER]
+    api = controller.api
+    report = controller.last_refresh_report
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "topology": {
+            "sites": len(api.sites),
+            "appliances": len(api.appliances),
+            "programs": len(api.programs),
+        },
+        "last_refresh": None
+        if report is None
+        else {
+            "duration": report.duration,
+            "latencies": report.latencies,
+            "retries": report.retries,
+            "changed_appliances": len(report.changes.appliances),
+            "changed_programs": len(report.changes.programs),
+            "errors": {
+                label: str(error) or type(error).__name__
+                for label, error in report.errors.items()
+            },
+        },
+        "requests": {
+            "total": api.request_stats.total,
+            "summary": api.request_stats.summary(),
+            "last": [
+                {
+                    "timestamp": record.timestamp,
+                    "endpoint": endpoint(record.url),
+                    "method": record.method,
+                    "status": record.status,
+                    "latency": record.latency,
+                    "bytes": record.size,
+                    "retries": record.retries,
+                    "cache_hit": record.cache_hit,
+                }
+                for record in api.request_stats.records[-DIAGNOSTICS_RECORDS:]
+            ],
+        },
+        "rate_limiter": {
+            "queue_depth": api.rate_limiter.queue_depth,
+            "throttle_count": api.rate_limiter.throttle_count,
+            "throttle_time": api.rate_limiter.throttle_time,
+        },
+        "response_cache": {
+            "entries": len(api.response_cache),
+            "hits": api.response_cache.hits,
+            "misses": api.response_cache.misses,
+        },
+        "write_queue": {"pending": api.write_queue.pending},
+        "open_circuits": api.circuit_breaker.open_circuits,
+        "backfill": controller.backfill.progress,
+        "token_expires_at": api.token_manager.expires_at,
+    }
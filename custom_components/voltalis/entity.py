@@ -1,23 +1,38 @@
 """Entity representing a Voltalis appliance."""
 from __future__ import annotations
 
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.entity import Entity
+from homeassistant.util import dt as dt_util
 
 from .aiovoltalis.appliance import VoltalisAppliance
-from .aiovoltalis.program import VoltalisProgram
-from .const import DOMAIN
+from .aiovoltalis.program import ProgramType, VoltalisProgram
+from .aiovoltalis.refresh import VoltalisHealth
+from .const import DOMAIN, STALE_AFTER
+from .scheduler import VoltalisPollClass
+
+if TYPE_CHECKING:
+    from .controller import VoltalisController
+
+
+class VoltalisEntity(Entity):
+    """Base class for Voltalis entities.
 
+    Entities subscribe to the ids of their backing appliance or program
+    on the controller, they are only woken up when those change or when
+    the API availability flips, not at every coordinator refresh.
+    """
 
-class VoltalisEntity(CoordinatorEntity):
-    """Base class for Voltalis entities."""
+    _attr_should_poll = False
+    appliance: VoltalisAppliance | None = None
+    program: VoltalisProgram | None = None
 
     def setupAppliance(
         self,
-        coordinator: DataUpdateCoordinator,
+        controller: VoltalisController,
         appliance: VoltalisAppliance,
     ) -> None:
         """Initialize the entity.
@@ -25,7 +40,8 @@ class VoltalisEntity(CoordinatorEntity):
         Given a appliance id and a short name for the entity, we provide basic device
         info, name, unique id, etc. for all derived entities.
         """
-        super().__init__(coordinator)
+        self.controller = controller
+        self.coordinator = controller.coordinator
         self.appliance = appliance
         self._attr_unique_id = str(appliance.id)
         self._attr_device_info = DeviceInfo(
@@ -37,7 +53,7 @@ class VoltalisEntity(CoordinatorEntity):
 
     def setupProgram(
         self,
-        coordinator: DataUpdateCoordinator,
+        controller: VoltalisController,
         program: VoltalisProgram,
     ) -> None:
         """Initialize the entity.
@@ -45,7 +61,8 @@ class VoltalisEntity(CoordinatorEntity):
         Given a program id and a short name for the entity, we provide basic device
         info, name, unique id, etc. for all derived entities.
         """
-        super().__init__(coordinator)
+        self.controller = controller
+        self.coordinator = controller.coordinator
         self.program = program
         self._attr_unique_id = str(program.id)
         self._attr_device_info = DeviceInfo(
@@ -54,3 +71,65 @@ class VoltalisEntity(CoordinatorEntity):
             manufacturer='Voltalis',
             model='Heater Program',
         )
+
+    def _subscriptions(self) -> Iterable[tuple[str, int]]:
+        """Get the topics and ids the entity follows."""
+        if self.appliance is not None:
+            return [("appliances", self.appliance.id)]
+        return [("programs", self.program.id)]
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the changes of the backing appliance or program."""
+        await super().async_added_to_hass()
+        for topic, item_id in self._subscriptions():
+            self.async_on_remove(
+                self.controller.subscriptions.subscribe(
+                    topic, item_id, self.async_write_ha_state
+                )
+            )
+
+    @property
+    def _health(self) -> VoltalisHealth | None:
+        """Get the refresh health of the backing appliance or program."""
+        if self.appliance is not None:
+            return self.appliance.health
+        return self.program.health
+
+    @property
+    def available(self) -> bool:
+        """Return True if the API answers and the device is not stale.
+
+        A device whose refresh failed keeps its last good state until it
+        has been failing for STALE_AFTER seconds.
+        """
+        health = self._health
+        return self.coordinator.last_update_success and (
+            health is None or not health.is_stale(STALE_AFTER)
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the refresh health of the device."""
+        health = self._health
+        if health is None:
+            return None
+        return {
+            "last_success": None
+            if health.last_success is None
+            else dt_util.utc_from_timestamp(health.last_success),
+            "error_count": health.error_count,
+            "last_error": health.last_error,
+        }
+
+    async def async_update(self) -> None:
+        """Refresh the backing appliance or program on demand.
+
+        The entity is not polled otherwise. Programs are refreshed with
+        the other programs of their data class.
+        """
+        if self.appliance is not None:
+            await self.controller.async_refresh_appliances([self.appliance.id])
+        elif self.program.programType == ProgramType.USER:
+            await self.controller.async_request_poll([VoltalisPollClass.USER_PROGRAMS])
+        else:
+            await self.controller.async_request_poll([VoltalisPollClass.QUICK_SETTINGS])
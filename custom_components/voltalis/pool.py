@@ -0,0 +1,90 @@
+"""Voltalis client pool shared by all the config entries."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .aiovoltalis import Voltalis
+from .const import (
+    MAX_CONCURRENT_REQUESTS,
+    POOL_MAX_CONCURRENT_REQUESTS,
+    POOL_TICK_SPACING,
+    REQUEST_STAGGER,
+    VOLTALIS_CLIENT_POOL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VoltalisClientPool:
+    """Class to share one session and one request budget between accounts.
+
+    All clients use the Home Assistant session, at most
+    POOL_MAX_CONCURRENT_REQUESTS requests are in flight to the Voltalis
+    host across all of them, and the coordinator ticks of the entries are
+    spaced by at least POOL_TICK_SPACING seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Set up the pool."""
+        self._hass = hass
+        self._semaphore = asyncio.Semaphore(POOL_MAX_CONCURRENT_REQUESTS)
+        self._clients: dict[str, Voltalis] = {}
+        self._next_tick = 0.0
+
+    @property
+    def clients(self) -> dict[str, Voltalis]:
+        """Get the clients by config entry id."""
+        return self._clients
+
+    @callback
+    def async_get_client(self, entry: ConfigEntry) -> Voltalis:
+        """Create the client of a config entry from its current data."""
+        self._clients[entry.entry_id] = Voltalis(
+            username=entry.data[CONF_EMAIL],
+            password=entry.data[CONF_PASSWORD],
+            auto_login=True,
+            session=async_get_clientsession(self._hass),
+            max_concurrent_requests=MAX_CONCURRENT_REQUESTS,
+            request_semaphore=self._semaphore,
+            request_stagger=REQUEST_STAGGER,
+        )
+        return self._clients[entry.entry_id]
+
+    @callback
+    def async_release_client(self, entry: ConfigEntry) -> None:
+        """Forget the client of an unloaded config entry."""
+        self._clients.pop(entry.entry_id, None)
+
+    async def async_wait_turn(self) -> None:
+        """Wait until this tick is POOL_TICK_SPACING after the previous one."""
+        now = time.monotonic()
+        tick = max(now, self._next_tick)
+        self._next_tick = tick + POOL_TICK_SPACING
+        if tick > now:
+            _LOGGER.debug("Stagger Voltalis poll by %.1fs", tick - now)
+            await asyncio.sleep(tick - now)
+
+
+@callback
+def async_get_client_pool(hass: HomeAssistant) -> VoltalisClientPool:
+    """Get the client pool of this Home Assistant instance."""
+    if VOLTALIS_CLIENT_POOL not in hass.data:
+        hass.data[VOLTALIS_CLIENT_POOL] = VoltalisClientPool(hass)
+    return hass.data[VOLTALIS_CLIENT_POOL]
+
+
+@callback
+def async_release_client_pool(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release the client of an entry, and the pool with the last one."""
+    if (pool := hass.data.get(VOLTALIS_CLIENT_POOL)) is None:
+        return
+    pool.async_release_client(entry)
+    if not pool.clients:
+        hass.data.pop(VOLTALIS_CLIENT_POOL)
@@ -0,0 +1,145 @@
+"""Adaptive polling scheduler for the Voltalis integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from enum import Enum
+
+from .aiovoltalis.refresh import VoltalisChanges
+from .const import (
+    AUTODIAG_INTERVAL,
+    CONSUMPTION_INTERVAL,
+    FAST_POLL_WINDOW,
+    FAST_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    POLL_BACKOFF_FACTOR,
+    POLL_MAX_BACKOFF,
+    QUICK_SETTINGS_INTERVAL,
+    SCAN_INTERVAL,
+    USER_PROGRAMS_INTERVAL,
+)
+
+
+class VoltalisPollClass(Enum):
+    """Enum of the data classes polled on their own schedule."""
+
+    APPLIANCES = "appliances"
+    DIAGNOSTICS = "diagnostics"
+    USER_PROGRAMS = "user_programs"
+    QUICK_SETTINGS = "quick_settings"
+    CONSUMPTION = "consumption"
+
+
+POLL_INTERVALS = {
+    VoltalisPollClass.APPLIANCES: SCAN_INTERVAL,
+    VoltalisPollClass.DIAGNOSTICS: AUTODIAG_INTERVAL,
+    VoltalisPollClass.USER_PROGRAMS: USER_PROGRAMS_INTERVAL,
+    VoltalisPollClass.QUICK_SETTINGS: QUICK_SETTINGS_INTERVAL,
+    VoltalisPollClass.CONSUMPTION: CONSUMPTION_INTERVAL,
+}
+
+
+class VoltalisPollScheduler:
+    """Decide which data classes are due at each coordinator tick.
+
+    Every class has its own base interval. It is stretched by
+    POLL_BACKOFF_FACTOR each time a poll brings no change or the API is
+    degraded, up to POLL_MAX_BACKOFF times the base interval, and reset
+    as soon as something changes. After a write command the written
+    classes are polled every FAST_SCAN_INTERVAL seconds for
+    FAST_POLL_WINDOW seconds.
+    """
+
+    def __init__(
+        self, intervals: dict[VoltalisPollClass, float] | None = None
+    ) -> None:
+        """Set up the scheduler, every class is due at once."""
+        self._intervals = intervals if intervals else dict(POLL_INTERVALS)
+        self._backoff = {poll_class: 1.0 for poll_class in self._intervals}
+        self._next_poll = {poll_class: 0.0 for poll_class in self._intervals}
+        self._fast_until = {poll_class: 0.0 for poll_class in self._intervals}
+
+    def interval(self, poll_class: VoltalisPollClass, now: float) -> float:
+        """Get the current interval of a data class."""
+        if now < self._fast_until[poll_class]:
+            return FAST_SCAN_INTERVAL
+        return self._intervals[poll_class] * self._backoff[poll_class]
+
+    def due(self, now: float) -> set[VoltalisPollClass]:
+        """Get the data classes to poll now."""
+        return {
+            poll_class
+            for poll_class, next_poll in self._next_poll.items()
+            # Tolerate the coordinator waking up slightly early
+            if next_poll <= now + 1
+        }
+
+    def next_delay(self, now: float) -> float:
+        """Get the delay in seconds until the next data class is due."""
+        return max(MIN_SCAN_INTERVAL, min(self._next_poll.values()) - now)
+
+    def record_initialized(self, now: float) -> None:
+        """Reschedule the data classes the initialization polled.
+
+        The consumption is not part of the initialization and stays due.
+        """
+        for poll_class in self._intervals:
+            if poll_class == VoltalisPollClass.CONSUMPTION:
+                continue
+            self._next_poll[poll_class] = now + self.interval(poll_class, now)
+
+    def record_success(
+        self,
+        polled: Iterable[VoltalisPollClass],
+        changes: VoltalisChanges,
+        degraded: bool,
+        now: float,
+    ) -> None:
+        """Reschedule the polled data classes after a successful refresh."""
+        for poll_class in polled:
+            if poll_class in (
+                VoltalisPollClass.APPLIANCES,
+                VoltalisPollClass.DIAGNOSTICS,
+            ):
+                changed = bool(changes.appliances)
+            elif poll_class == VoltalisPollClass.CONSUMPTION:
+                changed = bool(changes.consumption)
+            else:
+                changed = bool(changes.programs)
+
+            if changed and not degraded:
+                self._backoff[poll_class] = 1.0
+            else:
+                self._stretch(poll_class)
+            self._next_poll[poll_class] = now + self.interval(poll_class, now)
+
+    def record_failure(
+        self, polled: Iterable[VoltalisPollClass], now: float
+    ) -> None:
+        """Reschedule the polled data classes after a failed refresh."""
+        for poll_class in polled:
+            self._stretch(poll_class)
+            self._next_poll[poll_class] = now + self.interval(poll_class, now)
+
+    def request_poll(
+        self, requested: Iterable[VoltalisPollClass], now: float
+    ) -> None:
+        """Make data classes due now, for a refresh asked by the user."""
+        for poll_class in requested:
+            self._next_poll[poll_class] = now
+
+    def notify_write(
+        self, written: Iterable[VoltalisPollClass], now: float
+    ) -> None:
+        """Poll the written data classes fast for a while."""
+        for poll_class in written:
+            self._backoff[poll_class] = 1.0
+            self._fast_until[poll_class] = now + FAST_POLL_WINDOW
+            self._next_poll[poll_class] = min(
+                self._next_poll[poll_class], now + FAST_SCAN_INTERVAL
+            )
+
+    def _stretch(self, poll_class: VoltalisPollClass) -> None:
+        """Back off the interval of a data class."""
+        self._backoff[poll_class] = min(
+            POLL_MAX_BACKOFF, self._backoff[poll_class] * POLL_BACKOFF_FACTOR
+        )
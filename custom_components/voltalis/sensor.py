@@ -0,0 +1,187 @@
+"""Platform for sensor integration."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfEnergy, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .aiovoltalis.appliance import VoltalisAppliance
+from .aiovoltalis.site import VoltalisSite
+from .const import DOMAIN, VOLTALIS_CONTROLLER
+from .entity import VoltalisEntity
+from .scheduler import VoltalisPollClass
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class VoltalisApiSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor computed from the request statistics."""
+
+    value_fn: Callable[[dict[str, Any]], float | None] = lambda summary: None
+
+
+API_SENSORS = (
+    VoltalisApiSensorEntityDescription(
+        key="api_latency",
+        name="API latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda summary: None
+        if summary["latency_mean"] is None
+        else summary["latency_mean"] * 1000,
+    ),
+    VoltalisApiSensorEntityDescription(
+        key="api_error_rate",
+        name="API error rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda summary: None
+        if summary["error_rate"] is None
+        else summary["error_rate"] * 100,
+    ),
+    VoltalisApiSensorEntityDescription(
+        key="api_calls",
+        name="API calls per hour",
+        native_unit_of_measurement="calls/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda summary: summary["calls_per_hour"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the Voltalis sensors."""
+    controller = hass.data[DOMAIN][entry.entry_id][VOLTALIS_CONTROLLER]
+    entities: list[SensorEntity] = [
+        VoltalisApiSensor(controller, entry, description) for description in API_SENSORS
+    ]
+    for site in controller.api.sites:
+        entities.append(VoltalisSiteConsumptionSensor(controller, site))
+    for appliance in controller.appliances:
+        entities.append(VoltalisApplianceConsumptionSensor(controller, appliance))
+    async_add_entities(entities)
+
+
+class VoltalisApiSensor(CoordinatorEntity, SensorEntity):
+    """Voltalis API statistics sensor, disabled by default."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: VoltalisApiSensorEntityDescription
+
+    def __init__(
+        self,
+        controller,
+        entry: ConfigEntry,
+        description: VoltalisApiSensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(controller.coordinator)
+        self.controller = controller
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name="Voltalis API",
+            manufacturer="Voltalis",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Stay available when the API fails, errors are what it measures."""
+        return True
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the statistic over the last hour."""
+        return self.entity_description.value_fn(
+            self.controller.api.request_stats.summary()
+        )
+
+
+class VoltalisConsumptionSensor(VoltalisEntity, SensorEntity):
+    """Base class for the Voltalis consumption sensors.
+
+    The state is the energy fetched since the start, the API only sends
+    the new samples at each poll.
+    """
+
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfEnergy.WATT_HOUR
+    _attr_suggested_display_precision = 0
+    _attr_name = "Consumption"
+    site: VoltalisSite
+
+    @property
+    def _health(self) -> None:
+        """Follow the API availability only, not the appliance refreshes."""
+        return None
+
+    def _subscriptions(self) -> Iterable[tuple[str, int]]:
+        """Follow the new samples of the site."""
+        return [("consumption", self.site.id)]
+
+    async def async_update(self) -> None:
+        """Fetch the new samples on demand."""
+        await self.controller.async_request_poll([VoltalisPollClass.CONSUMPTION])
+
+
+class VoltalisSiteConsumptionSensor(VoltalisConsumptionSensor):
+    """Voltalis consumption of a whole site."""
+
+    def __init__(self, controller, site: VoltalisSite) -> None:
+        """Initialize the entity."""
+        self.controller = controller
+        self.coordinator = controller.coordinator
+        self.site = site
+        self._attr_unique_id = f"site_{site.id}_consumption"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"site_{site.id}")},
+            name=site.name or f"Voltalis site {site.id}",
+            manufacturer="Voltalis",
+            model="Site",
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the energy of the site in Wh."""
+        return self.site.consumption.total
+
+
+class VoltalisApplianceConsumptionSensor(VoltalisConsumptionSensor):
+    """Voltalis consumption of an appliance."""
+
+    def __init__(self, controller, appliance: VoltalisAppliance) -> None:
+        """Initialize the entity."""
+        super().setupAppliance(controller, appliance)
+        self.site = appliance.site
+        self._attr_unique_id = f"{appliance.id}_consumption"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the energy of the appliance in Wh."""
+        return self.site.consumption.appliance_totals.get(self.appliance.id)
@@ -0,0 +1,170 @@
+"""Services for the Voltalis integration."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components.climate import ATTR_PRESET_MODE
+from homeassistant.const import ATTR_TEMPERATURE, CONF_ENABLED, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from .const import (
+    BACKFILL_DEFAULT_DAYS,
+    BACKFILL_MAX_DAYS,
+    DOMAIN,
+    SERVICE_BACKFILL_CONSUMPTION,
+    SERVICE_CANCEL_BACKFILL,
+    SERVICE_SET_PAYLOAD_LOGGING,
+    SERVICE_SET_ZONE,
+    VOLTALIS_CONTROLLER,
+    VOLTALIS_PRESET_MODES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SET_ZONE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **cv.TARGET_SERVICE_FIELDS,
+            vol.Optional(ATTR_PRESET_MODE): vol.In(list(VOLTALIS_PRESET_MODES)),
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_PRESET_MODE, ATTR_TEMPERATURE),
+)
+
+ATTR_SAMPLE_RATE = "sample_rate"
+
+SET_PAYLOAD_LOGGING_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ENABLED): cv.boolean,
+        vol.Optional(ATTR_SAMPLE_RATE, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+    }
+)
+
+ATTR_DAYS = "days"
+
+BACKFILL_CONSUMPTION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DAYS, default=BACKFILL_DEFAULT_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=BACKFILL_MAX_DAYS)
+        ),
+    }
+)
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Voltalis services."""
+    if hass.services.has_service(DOMAIN, SERVICE_SET_ZONE):
+        return
+
+    async def async_set_zone(call: ServiceCall) -> ServiceResponse:
+        """Apply one preset mode and/or temperature to many heaters."""
+        entity_registry = er.async_get(hass)
+        preset_mode = call.data.get(ATTR_PRESET_MODE)
+        mode = VOLTALIS_PRESET_MODES[preset_mode] if preset_mode else None
+        temperature = call.data.get(ATTR_TEMPERATURE)
+
+        succeeded: list[str] = []
+        failed: dict[str, str] = {}
+        targets: dict[str, dict[int, str]] = {}
+        for entity_id in await async_extract_entity_ids(hass, call):
+            entry = entity_registry.async_get(entity_id)
+            if (
+                entry is None
+                or entry.platform != DOMAIN
+                or entry.domain != Platform.CLIMATE
+                or entry.config_entry_id not in hass.data[DOMAIN]
+            ):
+                failed[entity_id] = "not a Voltalis heater"
+                continue
+            targets.setdefault(entry.config_entry_id, {})[int(entry.unique_id)] = entity_id
+
+        for config_entry_id, entity_ids in targets.items():
+            controller = hass.data[DOMAIN][config_entry_id][VOLTALIS_CONTROLLER]
+            appliances = []
+            for appliance_id, entity_id in entity_ids.items():
+                if (appliance := controller.get_appliance(appliance_id)) is None:
+                    failed[entity_id] = "unknown appliance"
+                else:
+                    appliances.append(appliance)
+
+            results = await controller.async_set_zone(appliances, mode, temperature)
+            for appliance_id, error in results.items():
+                if error is None:
+                    succeeded.append(entity_ids[appliance_id])
+                else:
+                    failed[entity_ids[appliance_id]] = str(error) or type(error).__name__
+
+        if failed:
+            _LOGGER.warning("Voltalis set_zone failed for %s", failed)
+        return {"succeeded": succeeded, "failed": failed}
+
+    async def async_set_payload_logging(call: ServiceCall) -> None:
+        """Start or stop logging the API payloads of every entry."""
+        for data in hass.data[DOMAIN].values():
+            payload_log = data[VOLTALIS_CONTROLLER].api.payload_log
+            if call.data[CONF_ENABLED]:
+                payload_log.enable(call.data[ATTR_SAMPLE_RATE])
+            else:
+                payload_log.disable()
+
+    async def async_backfill_consumption(call: ServiceCall) -> ServiceResponse:
+        """Start backfilling the consumption history of every entry."""
+        return {
+            config_entry_id: {
+                "started": data[VOLTALIS_CONTROLLER].backfill.async_start(
+                    call.data[ATTR_DAYS]
+                )
+            }
+            for config_entry_id, data in hass.data[DOMAIN].items()
+        }
+
+    async def async_cancel_backfill(call: ServiceCall) -> None:
+        """Cancel the consumption backfill of every entry."""
+        for data in hass.data[DOMAIN].values():
+            await data[VOLTALIS_CONTROLLER].backfill.async_cancel()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_ZONE,
+        async_set_zone,
+        schema=SET_ZONE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_PAYLOAD_LOGGING,
+        async_set_payload_logging,
+        schema=SET_PAYLOAD_LOGGING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_CONSUMPTION,
+        async_backfill_consumption,
+        schema=BACKFILL_CONSUMPTION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_CANCEL_BACKFILL, async_cancel_backfill
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the Voltalis services once the last entry is unloaded."""
+    if hass.data.get(DOMAIN):
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_SET_ZONE)
+    hass.services.async_remove(DOMAIN, SERVICE_SET_PAYLOAD_LOGGING)
+    hass.services.async_remove(DOMAIN, SERVICE_BACKFILL_CONSUMPTION)
+    hass.services.async_remove(DOMAIN, SERVICE_CANCEL_BACKFILL)
@@ -14,6 +14,7 @@ from .const import (
     VOLTALIS_CONTROLLER,
 )
 from .entity import VoltalisEntity
+from .scheduler import VoltalisPollClass
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,7 +26,7 @@ async def async_setup_entry(
     controller = hass.data[DOMAIN][entry.entry_id][VOLTALIS_CONTROLLER]
     entities = []
     for program in controller.programs:
-        entities.append(VoltalisProgram(controller.coordinator, program))
+        entities.append(VoltalisProgram(controller, program))
     async_add_entities(entities)
 
 class VoltalisProgram(VoltalisEntity, SwitchEntity):
@@ -35,10 +36,9 @@ class VoltalisProgram(VoltalisEntity, SwitchEntity):
     _attr_name = None
     _attr_icon = "mdi:toggle-switch"
 
-    def __init__(self, coordinator, program):
+    def __init__(self, controller, program):
         """Initialize the entity."""
-        super().setupProgram(coordinator, program)
-        self.coordinator = coordinator
+        super().setupProgram(controller, program)
 
     @property
     def is_on(self) -> bool:
@@ -48,16 +48,14 @@ class VoltalisProgram(VoltalisEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs) -> None:
         """Set state to ON."""
         await self.async_set_state(True)
-        await self.coordinator.async_refresh()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Set state to OFF."""
         await self.async_set_state(False)
-        await self.coordinator.async_refresh()
 
     async def async_set_state(self, state:bool) -> None:
         """Set the state throught the API."""
-        if self.program._program_type == ProgramType.USER:
+        if self.program.programType == ProgramType.USER:
             curjson = {
                 "name": self.program.name,
                 "enabled": state
@@ -66,6 +64,7 @@ class VoltalisProgram(VoltalisEntity, SwitchEntity):
                 json = curjson,
                 program_id = self.program.id
             )
+            self.controller.async_notify_write([VoltalisPollClass.USER_PROGRAMS])
         else:
             curjson = {
                 "enabled": state
@@ -74,4 +73,6 @@ class VoltalisProgram(VoltalisEntity, SwitchEntity):
                 json = curjson,
                 program_id = self.program.id
             )
-        await self.coordinator.async_refresh()
+            self.controller.async_notify_write([VoltalisPollClass.QUICK_SETTINGS])
+        # The fast poll of the written data class confirms the change
+        self.async_write_ha_state()
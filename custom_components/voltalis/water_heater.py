@@ -28,7 +28,7 @@ async def async_setup_entry(
     entities = []
     for appliance in controller.appliances:
         if appliance.applianceType == VOLTALIS_WATERHEATER_TYPE:
-            entities.append(VoltalisWaterHeater(controller.coordinator, appliance))
+            entities.append(VoltalisWaterHeater(controller, appliance))
     async_add_entities(entities)
 
 
@@ -38,9 +38,9 @@ class VoltalisWaterHeater(VoltalisEntity, WaterHeaterEntity):
     _attr_has_entity_name = True
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
 
-    def __init__(self, coordinator, appliance):
+    def __init__(self, controller, appliance):
         """Initialize the entity."""
-        super().setupAppliance(coordinator, appliance)
+        super().setupAppliance(controller, appliance)
 
     @property
     def target_temperature(self) -> float | None:
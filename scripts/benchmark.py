@@ -0,0 +1,131 @@
+"""Benchmark the aiovoltalis poll cycle against the offline mock API.
+
+    python scripts/benchmark.py --appliances 1,10,100,500 --cycles 20 --latency 0.05
+
+Report, for each number of appliances, the p50 and p99 poll cycle time,
+the number of requests per cycle and the memory used per appliance.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+from aiohttp import ClientSession
+
+from mock_server import MockVoltalisServer, add_arguments
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "custom_components" / "voltalis"))
+
+from aiovoltalis import Voltalis  # noqa: E402
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Get a percentile of the values."""
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+async def async_benchmark(appliances: int, args: argparse.Namespace) -> dict:
+    """Run the poll cycles for one site size."""
+    server = MockVoltalisServer(
+        appliances=appliances,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_lifetime=args.token_lifetime,
+        change_rate=args.change_rate,
+        etag=args.etag,
+        sites=args.sites,
+        seed=args.seed,
+    )
+    base_url = await server.async_start()
+    async with ClientSession() as session:
+        voltalis = Voltalis(
+            username="benchmark",
+            password="benchmark",
+            auto_login=True,
+            session=session,
+            base_url=base_url,
+            max_concurrent_requests=args.concurrency,
+            bulk_refresh=not args.per_id,
+            stream_appliances=args.stream,
+        )
+
+        tracemalloc.start()
+        start = time.monotonic()
+        await voltalis.async_initialize()
+        startup = time.monotonic() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        startup_requests = server.request_count
+
+        durations = []
+        failures = 0
+        tracemalloc.start()
+        for _ in range(args.cycles):
+            start = time.monotonic()
+            try:
+                await voltalis.async_refresh()
+            except Exception:  # pylint: disable=broad-except
+                failures += 1
+            durations.append(time.monotonic() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    await server.async_stop()
+    return {
+        "appliances": appliances,
+        "startup": startup,
+        "startup_requests": startup_requests,
+        "p50": _percentile(durations, 50),
+        "p99": _percentile(durations, 99),
+        "requests": (server.request_count - startup_requests) / args.cycles,
+        "failures": failures,
+        "memory": memory / appliances,
+        "peak": peak,
+    }
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    header = (
+        f"{'appliances':>10} {'startup':>9} {'start req':>9} {'p50':>9} "
+        f"{'p99':>9} {'req/cycle':>9} {'failed':>6} {'bytes/appl':>10} "
+        f"{'cycle peak':>10}"
+    )
+    print(header)  # noqa: T201
+    for appliances in args.appliances:
+        result = await async_benchmark(appliances, args)
+        print(  # noqa: T201
+            f"{result['appliances']:>10} {result['startup'] * 1000:>7.1f}ms "
+            f"{result['startup_requests']:>9} {result['p50'] * 1000:>7.1f}ms "
+            f"{result['p99'] * 1000:>7.1f}ms {result['requests']:>9.1f} "
+            f"{result['failures']:>6} {result['memory']:>10.0f} "
+            f"{result['peak'] / 1024:>8.0f}kB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--appliances",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 10, 100, 500],
+        help="comma separated site sizes, from 1 to 500",
+    )
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--per-id", action="store_true", help="disable bulk refresh")
+    parser.add_argument(
+        "--stream", action="store_true", help="decode the appliance list item by item"
+    )
+    parser.add_argument("--debug", action="store_true")
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    asyncio.run(_async_main(args))
@@ -0,0 +1,430 @@
+"""Offline stand-in for the Voltalis API.
+
+Serve every endpoint used by aiovoltalis with configurable latency, error
+rate, token lifetime, number of sites and number of appliances:
+
+    python scripts/mock_server.py --appliances 50 --latency 0.08 --error-rate 0.02
+
+Point the client to it with Voltalis(base_url="http://127.0.0.1:8080").
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import calendar
+import contextlib
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web
+
+MODES = ["ECO", "CONFORT", "TEMPERATURE", "HORS_GEL", "NORMAL"]
+
+
+def _b64(data: bytes) -> str:
+    """Encode base64url without padding."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class MockVoltalisServer:
+    """Class to serve a fake Voltalis API."""
+
+    def __init__(
+        self,
+        appliances: int = 10,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        token_lifetime: float = 3600,
+        change_rate: float = 0.0,
+        etag: bool = True,
+        site_id: int = 1234,
+        sites: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """Set up the fake API state.
+
+        The appliances are spread over the sites, every site has its own
+        programs and quick settings.
+        """
+        if not 1 <= appliances <= 500:
+            raise ValueError("appliances must be between 1 and 500")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.change_rate = change_rate
+        self.etag = etag
+        self.site_id = site_id
+        self.site_ids = [site_id + index for index in range(sites)]
+        self.request_count = 0
+        self.requests: dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._tokens: dict[str, float] = {}
+        self._runner: web.AppRunner | None = None
+
+        self.appliances = {
+            appliance_id: self._appliance(appliance_id)
+            for appliance_id in range(1, appliances + 1)
+        }
+        self.manualsettings = {
+            1000 + appliance_id: {
+                "id": 1000 + appliance_id,
+                "idAppliance": appliance_id,
+                "enabled": False,
+            }
+            for appliance_id in self.appliances
+        }
+        self.appliance_sites = {
+            appliance_id: self.site_ids[(appliance_id - 1) % sites]
+            for appliance_id in self.appliances
+        }
+        self.programs = {}
+        self.quicksettings = {}
+        self.program_sites = {}
+        for index, site in enumerate(self.site_ids):
+            offset = 100 * index
+            self.programs[1 + offset] = {"id": 1 + offset, "name": "Semaine", "enabled": True}
+            self.programs[2 + offset] = {"id": 2 + offset, "name": "Vacances", "enabled": False}
+            self.quicksettings[10 + offset] = {"id": 10 + offset, "name": "Absence", "enabled": False}
+            self.quicksettings[11 + offset] = {"id": 11 + offset, "name": "Hors gel", "enabled": False}
+            for program_id in (1, 2, 10, 11):
+                self.program_sites[program_id + offset] = site
+        self.reachable = {appliance_id: True for appliance_id in self.appliances}
+
+    def _appliance(self, appliance_id: int) -> dict:
+        """Build a fake appliance payload."""
+        return {
+            "id": appliance_id,
+            "name": f"radiateur {appliance_id}",
+            "applianceType": "HEATER" if appliance_id % 10 else "WATER_HEATER",
+            "modulatorType": "VX_WIRE",
+            "availableModes": MODES,
+            "voltalisVersion": "3.0",
+            "heatingLevel": 3,
+            "programming": {
+                "progType": "USER",
+                "progName": "Semaine",
+                "idManualSetting": 1000 + appliance_id,
+                "isOn": True,
+                "untilFurtherNotice": False,
+                "mode": "ECO",
+                "idPlanning": 1,
+                "endDate": None,
+                "temperatureTarget": 19.0,
+                "defaultTemperature": 19.0,
+            },
+        }
+
+    def _drift(self) -> None:
+        """Change some appliances, as users and programs would."""
+        for appliance in self.appliances.values():
+            if self._random.random() < self.change_rate:
+                programming = dict(appliance["programming"])
+                programming["mode"] = self._random.choice(MODES)
+                programming["temperatureTarget"] = float(self._random.randint(16, 22))
+                appliance["programming"] = programming
+
+    def _issue_token(self) -> str:
+        """Issue an unsigned JWT token with an exp claim."""
+        expires_at = time.time() + self.token_lifetime
+        header = _b64(json.dumps({"alg": "none", "typ": "JWT"}).encode())
+        payload = _b64(
+            json.dumps({"exp": int(expires_at), "jti": self.request_count}).encode()
+        )
+        token = f"{header}.{payload}.mock"
+        self._tokens[token] = expires_at
+        return token
+
+    def _json(self, request: web.Request, data) -> web.Response:
+        """Answer json, or 304 when the client copy is still valid."""
+        body = json.dumps(data)
+        if not self.etag:
+            return web.Response(text=body, content_type="application/json")
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            text=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count requests, add latency, errors and check the token."""
+        self.request_count += 1
+        resource = request.match_info.route.resource
+        key = f"{request.method} {resource.canonical if resource else request.path}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(
+                max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            )
+        if self._random.random() < self.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        if request.path != "/auth/login":
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if self._tokens.get(token, 0) < time.time():
+                return web.Response(status=401, text="Token expired")
+        return await handler(request)
+
+    async def _login(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("login") or not body.get("password"):
+            return web.Response(status=401, text="Bad credentials")
+        return web.json_response({"token": self._issue_token()})
+
+    async def _logout(self, request: web.Request) -> web.Response:
+        self._tokens.pop(
+            request.headers.get("Authorization", "").removeprefix("Bearer "), None
+        )
+        return web.Response(status=200)
+
+    async def _me(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "defaultSite": {"id": self.site_id, "name": "Maison"},
+                "otherSites": [
+                    {"id": site, "name": f"Maison {site}"} for site in self.site_ids[1:]
+                ],
+            }
+        )
+
+    def _site_items(self, request: web.Request, items: dict, sites: dict) -> list:
+        """Get the items of the requested site."""
+        site = int(request.match_info["site_id"])
+        return [item for item_id, item in items.items() if sites[item_id] == site]
+
+    async def _appliances(self, request: web.Request) -> web.Response:
+        self._drift()
+        return self._json(
+            request, self._site_items(request, self.appliances, self.appliance_sites)
+        )
+
+    async def _appliance_get(self, request: web.Request) -> web.Response:
+        appliance = self.appliances.get(int(request.match_info["id"]))
+        if appliance is None:
+            return web.Response(status=404, text="Not found")
+        return self._json(request, appliance)
+
+    async def _manualsettings(self, request: web.Request) -> web.Response:
+        return self._json(
+            request,
+            [
+                manualsetting
+                for manualsetting in self.manualsettings.values()
+                if self.appliance_sites[manualsetting["idAppliance"]]
+                == int(request.match_info["site_id"])
+            ],
+        )
+
+    async def _manualsetting_put(self, request: web.Request) -> web.Response:
+        manualsetting_id = int(request.match_info["id"])
+        if manualsetting_id not in self.manualsettings:
+            return web.Response(status=404, text="Not found")
+        body = await request.json()
+        self.manualsettings[manualsetting_id] = body
+        appliance = self.appliances[body["idAppliance"]]
+        programming = dict(appliance["programming"])
+        if body.get("enabled"):
+            programming["progType"] = "MANUAL"
+            for key in ("isOn", "untilFurtherNotice", "mode", "endDate", "temperatureTarget"):
+                if key in body:
+                    programming[key] = body[key]
+        else:
+            programming["progType"] = "USER"
+        appliance["programming"] = programming
+        return web.json_response(body)
+
+    async def _programs(self, request: web.Request) -> web.Response:
+        return self._json(
+            request, self._site_items(request, self.programs, self.program_sites)
+        )
+
+    async def _program_get(self, request: web.Request) -> web.Response:
+        program = self.programs.get(int(request.match_info["id"]))
+        if program is None:
+            return web.Response(status=404, text="Not found")
+        return self._json(request, program)
+
+    async def _program_put(self, request: web.Request) -> web.Response:
+        program = self.programs.get(int(request.match_info["id"]))
+        if program is None:
+            return web.Response(status=404, text="Not found")
+        program.update(await request.json())
+        return web.json_response(program)
+
+    async def _quicksettings(self, request: web.Request) -> web.Response:
+        return self._json(
+            request, self._site_items(request, self.quicksettings, self.program_sites)
+        )
+
+    async def _quicksetting_enable(self, request: web.Request) -> web.Response:
+        quicksetting = self.quicksettings.get(int(request.match_info["id"]))
+        if quicksetting is None:
+            return web.Response(status=404, text="Not found")
+        quicksetting["enabled"] = (await request.json())["enabled"]
+        return web.json_response(quicksetting)
+
+    async def _autodiag(self, request: web.Request) -> web.Response:
+        return self._json(
+            request,
+            [
+                {"csApplianceId": appliance_id, "status": "OK" if reachable else "NOK"}
+                for appliance_id, reachable in self.reachable.items()
+                if self.appliance_sites[appliance_id] == int(request.match_info["site_id"])
+            ],
+        )
+
+    async def _consumption(self, request: web.Request) -> web.Response:
+        step = 600
+        points = min(int(request.query.get("numPoints", 1)), 1440)
+        site = int(request.match_info["site_id"])
+        now = time.time()
+        current = int(now // step) * step
+        consumptions = []
+        for index in range(points - 1, -1, -1):
+            timestamp = current - index * step
+            # The current step is still growing
+            share = (now - current) / step if index == 0 else 1.0
+            appliances = [
+                {
+                    "csApplianceId": appliance_id,
+                    "consumptionInWh": round(
+                        (appliance_id * 7 + timestamp // step) % 50 * share, 1
+                    ),
+                }
+                for appliance_id, appliance_site in self.appliance_sites.items()
+                if appliance_site == site
+            ]
+            consumptions.append(
+                {
+                    "stepTimestampInUtc": time.strftime(
+                        "%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp)
+                    ),
+                    "totalConsumptionInWh": round(
+                        sum(item["consumptionInWh"] for item in appliances), 1
+                    ),
+                    "appliances": appliances,
+                }
+            )
+        return self._json(
+            request, {"aggregationStepInSeconds": step, "consumptions": consumptions}
+        )
+
+    async def _consumption_history(self, request: web.Request) -> web.Response:
+        step = 3600
+        site = int(request.match_info["site_id"])
+
+        def parse(value: str) -> int:
+            return calendar.timegm(time.strptime(value, "%Y-%m-%dT%H:%M:%SZ"))
+
+        start = parse(request.query["from"]) // step * step
+        end = min(parse(request.query["to"]), int(time.time()) // step * step)
+        consumptions = []
+        for timestamp in range(start, end, step):
+            appliances = [
+                {
+                    "csApplianceId": appliance_id,
+                    "consumptionInWh": float((appliance_id * 7 + timestamp // step) % 300),
+                }
+                for appliance_id, appliance_site in self.appliance_sites.items()
+                if appliance_site == site
+            ]
+            consumptions.append(
+                {
+                    "stepTimestampInUtc": time.strftime(
+                        "%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp)
+                    ),
+                    "totalConsumptionInWh": sum(
+                        item["consumptionInWh"] for item in appliances
+                    ),
+                    "appliances": appliances,
+                }
+            )
+        return self._json(
+            request, {"aggregationStepInSeconds": step, "consumptions": consumptions}
+        )
+
+    def make_app(self) -> web.Application:
+        """Build the aiohttp application."""
+        app = web.Application(middlewares=[self._middleware])
+        site = "/api/site/{site_id}"
+        app.router.add_post("/auth/login", self._login)
+        app.router.add_delete("/auth/logout", self._logout)
+        app.router.add_get("/api/account/me", self._me)
+        app.router.add_get(f"{site}/managed-appliance", self._appliances)
+        app.router.add_get(f"{site}/managed-appliance/{{id}}", self._appliance_get)
+        app.router.add_get(f"{site}/manualsetting", self._manualsettings)
+        app.router.add_put(f"{site}/manualsetting/{{id}}", self._manualsetting_put)
+        app.router.add_get(f"{site}/programming/program", self._programs)
+        app.router.add_get(f"{site}/programming/program/{{id}}", self._program_get)
+        app.router.add_put(f"{site}/programming/program/{{id}}", self._program_put)
+        app.router.add_get(f"{site}/quicksettings", self._quicksettings)
+        app.router.add_put(
+            f"{site}/quicksettings/{{id}}/enable", self._quicksetting_enable
+        )
+        app.router.add_get(f"{site}/autodiag", self._autodiag)
+        app.router.add_get(f"{site}/consumption/realtime", self._consumption)
+        app.router.add_get(f"{site}/consumption/history", self._consumption_history)
+        return app
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base url."""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the mock server options to a parser."""
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-lifetime", type=float, default=3600, help="seconds")
+    parser.add_argument("--change-rate", type=float, default=0.0)
+    parser.add_argument("--no-etag", dest="etag", action="store_false")
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    server = MockVoltalisServer(
+        appliances=args.appliances,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_lifetime=args.token_lifetime,
+        change_rate=args.change_rate,
+        etag=args.etag,
+        sites=args.sites,
+        seed=args.seed,
+    )
+    base_url = await server.async_start(args.host, args.port)
+    print(f"Mock Voltalis API listening on {base_url}")  # noqa: T201
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.async_stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--appliances", type=int, default=10)
+    add_arguments(parser)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_async_main(parser.parse_args()))